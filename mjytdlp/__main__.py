@@ -1,12 +1,37 @@
+import importlib.util
 import os
+import sys
 
 from .app import create_app
 
 
 def main() -> None:
     port = int(os.getenv("PORT", "8000"))
-    app = create_app()
-    app.run(host="0.0.0.0", port=port)
+    dev = (os.getenv("MJYTDLP_DEV") or "").strip().lower() in ("1", "true", "yes", "on")
+    if dev or os.name == "nt" or importlib.util.find_spec("gunicorn") is None:
+        app = create_app()
+        app.run(host="0.0.0.0", port=port)
+        return
+
+    # One worker only: SSE sessions live in process memory, so scale with threads.
+    threads = os.getenv("MJYTDLP_THREADS") or "8"
+    os.execv(
+        sys.executable,
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "mjytdlp.wsgi:app",
+            "--bind",
+            f"0.0.0.0:{port}",
+            "--worker-class",
+            "gthread",
+            "--workers",
+            "1",
+            "--threads",
+            threads,
+        ],
+    )
 
 
 if __name__ == "__main__":
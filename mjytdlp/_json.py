@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+
+if orjson is not None:
+
+    def loads(data: str | bytes) -> Any:
+        return orjson.loads(data)
+
+    def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option).decode("utf-8")
+
+    def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(obj, option=option)
+
+    class JSONProvider(DefaultJSONProvider):
+        def dumps(self, obj: Any, **kwargs: Any) -> str:
+            option = orjson.OPT_NON_STR_KEYS
+            if kwargs.get("indent"):
+                option |= orjson.OPT_INDENT_2
+            if kwargs.get("sort_keys", self.sort_keys):
+                option |= orjson.OPT_SORT_KEYS
+            return orjson.dumps(obj, default=kwargs.get("default", self.default), option=option).decode("utf-8")
+
+        def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+            return orjson.loads(s)
+
+else:
+
+    def loads(data: str | bytes) -> Any:
+        return json.loads(data)
+
+    def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+        return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None, sort_keys=sort_keys)
+
+    def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+        if indent:
+            return (json.dumps(obj, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    JSONProvider = DefaultJSONProvider
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-import json
+import hmac
 import os
 import re
+import shutil
+import stat
 import time
-from typing import Any, Dict, List
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, List, Tuple
 
 from flask import (
     Blueprint,
@@ -18,47 +21,73 @@ from flask import (
     url_for,
 )
 
-from .mcp_settings import DEFAULT_MCP_SETTINGS, load_mcp_settings, save_mcp_settings
-from .utils import get_data_dir
+from . import _json
+from .auth import load_jwt_verifier
+from .mcp_settings import DEFAULT_MCP_SETTINGS, load_mcp_settings, providers_by_id, save_mcp_settings
+from .utils import get_data_dir, open_atomic
+from .yt_dlp_tools import invalidate_cookie_caches
 
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
+_COPY_CHUNK = 1024 * 1024
+_COOKIES_STATUS_TTL = 1.0
+
+_cookies_status_cache: Tuple[float, Dict[str, Any]] | None = None
+
+
+_ADMIN_PASSWORD: str | None = (os.getenv("MJYTDLP_ADMIN_PASSWORD") or "").strip() or None
+_ADMIN_PASSWORD_BYTES: bytes | None = _ADMIN_PASSWORD.encode("utf-8") if _ADMIN_PASSWORD else None
+_ADMIN_DISABLED: bool = (os.getenv("MJYTDLP_DISABLE_ADMIN") or "").strip().lower() in ("1", "true", "yes", "on")
+_JWT_VERIFIER = load_jwt_verifier()
+
 
 def _admin_password() -> str | None:
-    pw = os.getenv("MJYTDLP_ADMIN_PASSWORD")
-    if isinstance(pw, str) and pw.strip():
-        return pw.strip()
-    return None
+    return _ADMIN_PASSWORD
 
 
 def _admin_disabled() -> bool:
-    flag = os.getenv("MJYTDLP_DISABLE_ADMIN")
-    return isinstance(flag, str) and flag.strip().lower() in ("1", "true", "yes", "on")
+    return _ADMIN_DISABLED
+
+
+def admin_enabled() -> bool:
+    return bool(_ADMIN_PASSWORD) and not _ADMIN_DISABLED
 
 
 def _require_admin_enabled() -> None:
-    if _admin_disabled() or not _admin_password():
+    if not admin_enabled():
         abort(404)
 
 
-def _require_ui_login() -> None:
-    if not session.get("mjytdlp_admin"):
-        abort(401)
+def _require_ui_login(view: Callable[..., Response]) -> Callable[..., Response]:
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any) -> Response:
+        if not session.get("mjytdlp_admin"):
+            return redirect(url_for("admin.login_page"))
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def _check_admin_password(candidate: str) -> bool:
+    if not _ADMIN_PASSWORD_BYTES or not candidate:
+        return False
+    return hmac.compare_digest(candidate.encode("utf-8"), _ADMIN_PASSWORD_BYTES)
 
 
 def _require_api_auth() -> None:
-    pw = _admin_password()
-    if not pw:
+    if not _ADMIN_PASSWORD_BYTES:
         abort(404)
 
     header = request.headers.get("Authorization", "")
     token = ""
-    if isinstance(header, str) and header.lower().startswith("bearer "):
+    if header[:7].lower() == "bearer ":
         token = header[7:].strip()
     if not token:
         token = (request.headers.get("X-MJYTDLP-Admin-Password") or "").strip()
-    if token != pw:
+    if _JWT_VERIFIER is not None and token.count(".") == 2 and _JWT_VERIFIER.verify(token):
+        return
+    if not _check_admin_password(token):
         abort(401)
 
 
@@ -92,7 +121,7 @@ def _maybe_convert_cookie_json(raw_text: str) -> str | None:
     if not stripped.startswith("{") and not stripped.startswith("["):
         return None
     try:
-        payload = json.loads(raw_text)
+        payload = _json.loads(raw_text)
     except Exception:
         return None
 
@@ -137,37 +166,39 @@ def _maybe_convert_cookie_json(raw_text: str) -> str | None:
     return "\n".join(lines) + "\n" if len(lines) > 2 else None
 
 
+@lru_cache(maxsize=256)
+def _format_mtime(ts: int) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+
+
 def _list_named_cookies() -> List[Dict[str, Any]]:
     folder = _cookies_dir()
     out: List[Dict[str, Any]] = []
     try:
-        if not os.path.isdir(folder):
-            return out
-        for filename in os.listdir(folder):
-            if not filename.endswith(".txt"):
-                continue
-            path = os.path.join(folder, filename)
-            if not os.path.isfile(path):
-                continue
-            try:
-                size = os.path.getsize(path)
-                mtime_ts = os.path.getmtime(path)
-                mtime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime_ts))
-            except Exception:
-                size = None
-                mtime = None
-                mtime_ts = None
-            short_name = filename[:-4] if filename.endswith(".txt") else filename
-            out.append(
-                {
-                    "name": filename,
-                    "short_name": short_name,
-                    "path": path,
-                    "size": size,
-                    "mtime": mtime,
-                    "mtime_ts": mtime_ts,
-                }
-            )
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                filename = entry.name
+                if not filename.endswith(".txt") or not entry.is_file():
+                    continue
+                try:
+                    st = entry.stat()
+                    size = st.st_size
+                    mtime_ts = st.st_mtime
+                    mtime = _format_mtime(int(mtime_ts))
+                except Exception:
+                    size = None
+                    mtime = None
+                    mtime_ts = None
+                out.append(
+                    {
+                        "name": filename,
+                        "short_name": filename[:-4],
+                        "path": entry.path,
+                        "size": size,
+                        "mtime": mtime,
+                        "mtime_ts": mtime_ts,
+                    }
+                )
     except Exception:
         return out
     out.sort(key=lambda item: item.get("name") or "")
@@ -180,17 +211,19 @@ def _latest_named_cookie(named: List[Dict[str, Any]]) -> Dict[str, Any] | None:
     return max(named, key=lambda item: item.get("mtime_ts") or 0)
 
 
-def _cookies_status() -> Dict[str, Any]:
+def _read_cookies_status() -> Dict[str, Any]:
     path = _cookies_path()
-    exists = os.path.isfile(path)
+    exists = False
     size = None
     mtime = None
-    if exists:
-        try:
-            size = os.path.getsize(path)
-            mtime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(os.path.getmtime(path)))
-        except Exception:
-            pass
+    try:
+        st = os.stat(path)
+        exists = stat.S_ISREG(st.st_mode)
+        if exists:
+            size = st.st_size
+            mtime = _format_mtime(int(st.st_mtime))
+    except OSError:
+        pass
     named = _list_named_cookies()
     return {
         "path": path,
@@ -202,6 +235,23 @@ def _cookies_status() -> Dict[str, Any]:
     }
 
 
+def _cookies_status() -> Dict[str, Any]:
+    global _cookies_status_cache
+    now = time.monotonic()
+    cached = _cookies_status_cache
+    if cached is not None and now - cached[0] < _COOKIES_STATUS_TTL:
+        return cached[1]
+    status = _read_cookies_status()
+    _cookies_status_cache = (now, status)
+    return status
+
+
+def _invalidate_cookies_status() -> None:
+    global _cookies_status_cache
+    _cookies_status_cache = None
+    invalidate_cookie_caches()
+
+
 def _cookies_notice(code: str | None) -> Dict[str, str] | None:
     mapping = {
         "uploaded": {"kind": "ok", "text": "cookies.txt 上传成功。"},
@@ -238,7 +288,7 @@ def _mcp_ui_providers(settings: Dict[str, Any]) -> List[Dict[str, Any]]:
                 "api_key_masked": _mask_secret(api_key),
                 "auth_header": p.get("auth_header") or "",
                 "auth_prefix": p.get("auth_prefix") or "",
-                "extra_headers": json.dumps(p.get("extra_headers") or {}, ensure_ascii=False, indent=2),
+                "extra_headers": _json.dumps(p.get("extra_headers") or {}, indent=True),
                 "timeout": p.get("timeout") or "",
                 "enabled": bool(p.get("enabled", True)),
             }
@@ -258,9 +308,8 @@ def login_page() -> Response:
 
 @admin_bp.post("/login")
 def login_post() -> Response:
-    pw = _admin_password() or ""
     submitted = (request.form.get("password") or "").strip()
-    if submitted and submitted == pw:
+    if _check_admin_password(submitted):
         session["mjytdlp_admin"] = True
         return redirect(url_for("admin.panel"))
     return render_template("admin_login.html", error="密码不正确")
@@ -273,10 +322,8 @@ def logout_post() -> Response:
 
 
 @admin_bp.get("/")
+@_require_ui_login
 def panel() -> Response:
-    if not session.get("mjytdlp_admin"):
-        return redirect(url_for("admin.login_page"))
-
     return render_template(
         "admin_panel.html",
         home_dir=get_data_dir(),
@@ -286,10 +333,8 @@ def panel() -> Response:
 
 
 @admin_bp.get("/mcp")
+@_require_ui_login
 def mcp_panel() -> Response:
-    if not session.get("mjytdlp_admin"):
-        return redirect(url_for("admin.login_page"))
-
     settings = load_mcp_settings()
     providers = _mcp_ui_providers(settings)
     return render_template(
@@ -302,15 +347,13 @@ def mcp_panel() -> Response:
 
 
 @admin_bp.post("/mcp/provider")
+@_require_ui_login
 def mcp_provider_upsert() -> Response:
-    if not session.get("mjytdlp_admin"):
-        return redirect(url_for("admin.login_page"))
-
     def _get_bool(name: str) -> bool:
         return (request.form.get(name) or "").strip().lower() in ("1", "true", "yes", "on")
 
     settings = load_mcp_settings()
-    providers = settings.get("providers") if isinstance(settings.get("providers"), list) else []
+    by_id = providers_by_id(settings)
 
     pid = (request.form.get("id") or "").strip()
     if not pid:
@@ -323,7 +366,7 @@ def mcp_provider_upsert() -> Response:
             error="Provider id 不能为空。",
         )
 
-    existing = next((p for p in providers if isinstance(p, dict) and p.get("id") == pid), None)
+    existing = by_id.get(pid)
 
     api_key_input = (request.form.get("api_key") or "").strip()
     clear_api_key = _get_bool("clear_api_key")
@@ -338,7 +381,7 @@ def mcp_provider_upsert() -> Response:
     extra_headers_raw = (request.form.get("extra_headers") or "").strip()
     if extra_headers_raw:
         try:
-            parsed = json.loads(extra_headers_raw)
+            parsed = _json.loads(extra_headers_raw)
             if not isinstance(parsed, dict):
                 raise ValueError("extra_headers must be an object")
             extra_headers = parsed
@@ -376,6 +419,11 @@ def mcp_provider_upsert() -> Response:
                 return existing_val.strip()
         return default
 
+    auth_prefix = (request.form.get("auth_prefix") or "").lstrip()
+    if not auth_prefix.strip():
+        existing_prefix = existing.get("auth_prefix") if isinstance(existing, dict) else None
+        auth_prefix = existing_prefix if isinstance(existing_prefix, str) and existing_prefix.strip() else "Bearer "
+
     provider_payload: Dict[str, Any] = {
         "id": pid,
         "label": _inherit("label", pid) or pid,
@@ -385,18 +433,14 @@ def mcp_provider_upsert() -> Response:
         "api_key": api_key,
         "api_key_env": _inherit("api_key_env", ""),
         "auth_header": _inherit("auth_header", "Authorization") or "Authorization",
-        "auth_prefix": _inherit("auth_prefix", "Bearer ") or "Bearer ",
+        "auth_prefix": auth_prefix,
         "extra_headers": extra_headers,
         "timeout": timeout_val,
         "enabled": _get_bool("enabled"),
     }
 
-    if existing is not None:
-        providers = [provider_payload if p.get("id") == pid else p for p in providers]
-    else:
-        providers.append(provider_payload)
-
-    settings["providers"] = providers
+    by_id[pid] = provider_payload
+    settings["providers"] = list(by_id.values())
 
     if _get_bool("set_default"):
         settings["default_provider"] = pid
@@ -406,15 +450,13 @@ def mcp_provider_upsert() -> Response:
 
 
 @admin_bp.post("/mcp/provider/delete")
+@_require_ui_login
 def mcp_provider_delete() -> Response:
-    if not session.get("mjytdlp_admin"):
-        return redirect(url_for("admin.login_page"))
-
     pid = (request.form.get("id") or "").strip()
     settings = load_mcp_settings()
-    providers = settings.get("providers") if isinstance(settings.get("providers"), list) else []
-    providers = [p for p in providers if not (isinstance(p, dict) and p.get("id") == pid)]
-    settings["providers"] = providers
+    by_id = providers_by_id(settings)
+    by_id.pop(pid, None)
+    settings["providers"] = list(by_id.values())
     if settings.get("default_provider") == pid:
         settings["default_provider"] = None
     save_mcp_settings(settings)
@@ -422,14 +464,11 @@ def mcp_provider_delete() -> Response:
 
 
 @admin_bp.post("/mcp/default")
+@_require_ui_login
 def mcp_default_set() -> Response:
-    if not session.get("mjytdlp_admin"):
-        return redirect(url_for("admin.login_page"))
-
     pid = (request.form.get("default_provider") or "").strip()
     settings = load_mcp_settings()
-    providers = settings.get("providers") if isinstance(settings.get("providers"), list) else []
-    if pid and any(isinstance(p, dict) and p.get("id") == pid for p in providers):
+    if pid and pid in providers_by_id(settings):
         settings["default_provider"] = pid
     else:
         settings["default_provider"] = None
@@ -450,16 +489,15 @@ def api_set_mcp_settings() -> Response:
     if not isinstance(payload, dict):
         abort(400)
     merged = {**DEFAULT_MCP_SETTINGS, **payload}
-    if not save_mcp_settings(merged):
+    saved = save_mcp_settings(merged)
+    if saved is None:
         abort(500)
-    return jsonify({"ok": True, "settings": load_mcp_settings()})
+    return jsonify({"ok": True, "settings": saved})
 
 
 @admin_bp.post("/yt-dlp/cookies")
+@_require_ui_login
 def cookies_upload() -> Response:
-    if not session.get("mjytdlp_admin"):
-        return redirect(url_for("admin.login_page"))
-
     file = request.files.get("cookies_file")
     if file is None or not file.filename:
         return redirect(url_for("admin.panel", cookies="empty"))
@@ -478,33 +516,31 @@ def cookies_upload() -> Response:
         failure = "upload_failed"
     try:
         os.makedirs(os.path.dirname(target), exist_ok=True)
-        raw = file.read()
-        if not raw:
+        head = file.stream.read(_COPY_CHUNK)
+        if not head:
             return redirect(url_for("admin.panel", cookies="empty"))
-        text = raw.decode("utf-8", errors="ignore")
-        converted = _maybe_convert_cookie_json(text)
-        if converted is None and (file.filename.endswith(".json") or file.filename.endswith(".js")):
-            return redirect(url_for("admin.panel", cookies="format_invalid"))
-        if converted is not None:
-            with open(target, "w", encoding="utf-8") as fp:
-                fp.write(converted)
+        is_json_name = file.filename.endswith(".json") or file.filename.endswith(".js")
+        if is_json_name or head.lstrip()[:1] in (b"{", b"["):
+            raw = head + file.stream.read()
+            converted = _maybe_convert_cookie_json(raw.decode("utf-8", errors="ignore"))
+            if converted is None and is_json_name:
+                return redirect(url_for("admin.panel", cookies="format_invalid"))
+            with open_atomic(target) as fp:
+                fp.write(converted.encode("utf-8") if converted is not None else raw)
         else:
-            with open(target, "wb") as fp:
-                fp.write(raw)
-        try:
-            os.chmod(target, 0o600)
-        except Exception:
-            pass
+            with open_atomic(target) as fp:
+                fp.write(head)
+                shutil.copyfileobj(file.stream, fp, _COPY_CHUNK)
         return redirect(url_for("admin.panel", cookies=notice))
     except Exception:
         return redirect(url_for("admin.panel", cookies=failure))
+    finally:
+        _invalidate_cookies_status()
 
 
 @admin_bp.post("/yt-dlp/cookies/delete")
+@_require_ui_login
 def cookies_delete() -> Response:
-    if not session.get("mjytdlp_admin"):
-        return redirect(url_for("admin.login_page"))
-
     name = (request.form.get("cookies_name") or "").strip()
     if name:
         safe_name = _safe_cookie_name(name)
@@ -526,3 +562,5 @@ def cookies_delete() -> Response:
         return redirect(url_for("admin.panel", cookies=missing_code))
     except Exception:
         return redirect(url_for("admin.panel", cookies=failure_code))
+    finally:
+        _invalidate_cookies_status()
@@ -2,31 +2,68 @@ from __future__ import annotations
 
 import os
 import secrets
+from typing import Any, Callable, Dict, Iterable
 
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify
+from jinja2 import FileSystemBytecodeCache
 
-from .admin import admin_bp
+from ._json import JSONProvider
+from .admin import admin_bp, admin_enabled
 from .mcp import mcp_bp
+from .utils import eprint, get_data_dir
+
+
+_CORS_HEADERS = (
+    ("Access-Control-Allow-Origin", "*"),
+    ("Access-Control-Allow-Headers", "Content-Type, Authorization"),
+    ("Access-Control-Allow-Methods", "GET, POST, OPTIONS"),
+)
+
+
+def _preflight_middleware(wsgi_app: Callable[..., Iterable[bytes]]) -> Callable[..., Iterable[bytes]]:
+    def middleware(environ: Dict[str, Any], start_response: Callable[..., Any]) -> Iterable[bytes]:
+        if environ.get("REQUEST_METHOD") == "OPTIONS":
+            start_response("204 No Content", list(_CORS_HEADERS))
+            return []
+        return wsgi_app(environ, start_response)
+
+    return middleware
+
+
+def _enable_template_cache(app: Flask) -> None:
+    cache_dir = os.path.join(get_data_dir(), "jinja_cache")
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except Exception as exc:
+        eprint(f"WARNING: template cache disabled, unable to create {cache_dir}: {exc}")
+        return
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    for name in ("admin_login.html", "admin_panel.html", "admin_mcp.html"):
+        app.jinja_env.get_template(name)
 
 
 def create_app() -> Flask:
     app = Flask(__name__, template_folder="templates")
+    app.json = JSONProvider(app)
 
-    secret = os.getenv("MJYTDLP_SECRET_KEY")
-    app.secret_key = secret.strip() if isinstance(secret, str) and secret.strip() else secrets.token_hex(32)
+    secret = (os.getenv("MJYTDLP_SECRET_KEY") or "").strip()
+    if not secret and admin_enabled():
+        eprint("WARNING: MJYTDLP_SECRET_KEY is not set; using a random key, admin sessions will not survive restarts.")
+    app.secret_key = secret or secrets.token_hex(32)
 
-    if (os.getenv("MJYTDLP_ADMIN_PASSWORD") or "").strip() and not (
-        (os.getenv("MJYTDLP_DISABLE_ADMIN") or "").strip().lower() in ("1", "true", "yes", "on")
-    ):
+    if admin_enabled():
         app.register_blueprint(admin_bp)
+        _enable_template_cache(app)
 
     app.register_blueprint(mcp_bp)
+    app.wsgi_app = _preflight_middleware(app.wsgi_app)
+
+    if (os.getenv("MJYTDLP_PROFILE") or "").strip().lower() in ("1", "true", "yes", "on"):
+        from werkzeug.middleware.profiler import ProfilerMiddleware
 
-    @app.before_request
-    def _handle_options():
-        if request.method == "OPTIONS":
-            return "", 204
-        return None
+        profile_dir = os.path.join(get_data_dir(), "profiles")
+        os.makedirs(profile_dir, exist_ok=True)
+        app.wsgi_app = ProfilerMiddleware(app.wsgi_app, stream=None, profile_dir=profile_dir)
 
     @app.get("/")
     @app.get("/health")
@@ -35,9 +72,10 @@ def create_app() -> Flask:
 
     @app.after_request
     def _cors(resp):
-        resp.headers.setdefault("Access-Control-Allow-Origin", "*")
-        resp.headers.setdefault("Access-Control-Allow-Headers", "Content-Type, Authorization")
-        resp.headers.setdefault("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        headers = resp.headers
+        for name, value in _CORS_HEADERS:
+            if name not in headers:
+                headers[name] = value
         return resp
 
     return app
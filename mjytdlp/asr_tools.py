@@ -1,22 +1,30 @@
 from __future__ import annotations
 
+import http.cookiejar
 import os
-import tempfile
-from typing import Any, Dict, Optional
+import uuid
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional
 
 import requests
 
-from .utils import get_data_dir
 from .yt_dlp_tools import YtDlpError, audio_stream
 
 
 DEFAULT_ASR_TIMEOUT = 600
+CHUNK_SIZE = 4 * 1024 * 1024
+
+
+_HTTP_SESSION = requests.Session()
+# Shared across sites and callers for connection pooling only; never keep cookies.
+_HTTP_SESSION.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
 
 
 class AsrError(Exception):
     pass
 
 
+@lru_cache(maxsize=1)
 def _asr_config() -> tuple[str, Dict[str, str]]:
     base = (os.getenv("MJYTDLP_ASR_URL") or "").strip()
     if not base:
@@ -33,37 +41,58 @@ def _asr_config() -> tuple[str, Dict[str, str]]:
     return base, headers
 
 
-def _download_audio(
+def _check_content_length(resp: requests.Response, max_mb: int) -> None:
+    content_len = resp.headers.get("Content-Length")
+    if content_len and content_len.isdigit() and int(content_len) > max_mb * 1024 * 1024:
+        raise AsrError(f"音频大小超过限制（>{max_mb}MB）。")
+
+
+def _open_audio(
     url: str,
     headers: Dict[str, str],
     timeout: int,
     max_mb: Optional[int],
-    suffix: str,
-) -> str:
-    tmp_dir = os.path.join(get_data_dir(), "tmp")
-    os.makedirs(tmp_dir, exist_ok=True)
+) -> requests.Response:
+    if max_mb is not None:
+        try:
+            head = _HTTP_SESSION.head(url, headers=headers, timeout=timeout, allow_redirects=True)
+        except requests.RequestException:
+            head = None
+        if head is not None and head.ok:
+            _check_content_length(head, max_mb)
 
-    resp = requests.get(url, headers=headers, stream=True, timeout=timeout)
+    resp = _HTTP_SESSION.get(url, headers=headers, stream=True, timeout=timeout)
     try:
         resp.raise_for_status()
         if max_mb is not None:
-            max_bytes = max_mb * 1024 * 1024
-            content_len = resp.headers.get("Content-Length")
-            if content_len and content_len.isdigit() and int(content_len) > max_bytes:
-                raise AsrError(f"音频大小超过限制（>{max_mb}MB）。")
-
-        with tempfile.NamedTemporaryFile(delete=False, dir=tmp_dir, suffix=suffix) as fp:
-            total = 0
-            for chunk in resp.iter_content(chunk_size=1024 * 1024):
-                if not chunk:
-                    continue
-                fp.write(chunk)
-                total += len(chunk)
-                if max_mb is not None and total > max_bytes:
-                    raise AsrError(f"音频大小超过限制（>{max_mb}MB）。")
-            return fp.name
-    finally:
+            _check_content_length(resp, max_mb)
+    except BaseException:
         resp.close()
+        raise
+    return resp
+
+
+def _multipart_body(
+    resp: requests.Response,
+    boundary: str,
+    filename: str,
+    max_mb: Optional[int],
+) -> Iterator[bytes]:
+    yield (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="audio_file"; filename="{filename}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode("utf-8")
+    max_bytes = max_mb * 1024 * 1024 if max_mb is not None else None
+    total = 0
+    for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+        if not chunk:
+            continue
+        total += len(chunk)
+        if max_bytes is not None and total > max_bytes:
+            raise AsrError(f"音频大小超过限制（>{max_mb}MB）。")
+        yield chunk
+    yield f"\r\n--{boundary}--\r\n".encode("utf-8")
 
 
 def transcribe(
@@ -90,14 +119,6 @@ def transcribe(
     suffix = f".{ext}" if ext else ".audio"
     timeout_val = int(timeout) if isinstance(timeout, int) and timeout > 0 else DEFAULT_ASR_TIMEOUT
 
-    tmp_path = _download_audio(
-        download_url,
-        audio.get("http_headers") if isinstance(audio.get("http_headers"), dict) else {},
-        timeout_val,
-        max_mb,
-        suffix,
-    )
-
     asr_base, asr_headers = _asr_config()
     params: Dict[str, Any] = {
         "output": output,
@@ -110,15 +131,24 @@ def transcribe(
         params["initial_prompt"] = initial_prompt
 
     try:
-        with open(tmp_path, "rb") as fp:
-            files = {"audio_file": (os.path.basename(tmp_path), fp, "application/octet-stream")}
-            resp = requests.post(
-                f"{asr_base}/asr",
-                params=params,
-                files=files,
-                headers=asr_headers,
-                timeout=timeout_val,
-            )
+        audio_resp = _open_audio(
+            download_url,
+            audio.get("http_headers") if isinstance(audio.get("http_headers"), dict) else {},
+            timeout_val,
+            max_mb,
+        )
+    except requests.RequestException as exc:
+        raise AsrError(f"下载音频失败：{exc}") from exc
+
+    boundary = uuid.uuid4().hex
+    try:
+        resp = _HTTP_SESSION.post(
+            f"{asr_base}/asr",
+            params=params,
+            data=_multipart_body(audio_resp, boundary, f"audio{suffix}", max_mb),
+            headers={**asr_headers, "Content-Type": f"multipart/form-data; boundary={boundary}"},
+            timeout=timeout_val,
+        )
         resp.raise_for_status()
         return {
             "output": output,
@@ -127,7 +157,4 @@ def transcribe(
     except requests.RequestException as exc:
         raise AsrError(f"ASR 请求失败：{exc}") from exc
     finally:
-        try:
-            os.remove(tmp_path)
-        except Exception:
-            pass
+        audio_resp.close()
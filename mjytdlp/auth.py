@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from .utils import eprint
+
+
+VALID_TOKEN_CACHE_SIZE = 1024
+JWKS_REFRESH_INTERVAL = 300
+
+
+@dataclass(frozen=True)
+class BearerTokenAuthConfig:
+    jwks_url: str
+    audience: str
+    issuer: str
+
+    @classmethod
+    def from_env(cls) -> Optional["BearerTokenAuthConfig"]:
+        jwks_url = (os.getenv("MJYTDLP_JWT_JWKS_URL") or "").strip()
+        if not jwks_url:
+            return None
+        audience = (os.getenv("MJYTDLP_JWT_AUDIENCE") or "").strip()
+        issuer = (os.getenv("MJYTDLP_JWT_ISSUER") or "").strip()
+        if not audience or not issuer:
+            eprint(
+                "WARNING: MJYTDLP_JWT_JWKS_URL requires MJYTDLP_JWT_AUDIENCE and "
+                "MJYTDLP_JWT_ISSUER; JWT auth disabled."
+            )
+            return None
+        return cls(jwks_url=jwks_url, audience=audience, issuer=issuer)
+
+
+class JwtVerifier:
+    def __init__(self, config: BearerTokenAuthConfig) -> None:
+        import jwt
+
+        self._jwt = jwt
+        self._config = config
+        self._jwks = jwt.PyJWKClient(config.jwks_url)
+        self._keys: Dict[str, Any] = {}
+        self._refreshed_at = float("-inf")
+        self._jwks_lock = threading.Lock()
+        self._valid: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _signing_key(self, token: str) -> Any:
+        kid = self._jwt.get_unverified_header(token).get("kid")
+        with self._jwks_lock:
+            key = self._keys.get(kid)
+            # Unknown kids come from unauthenticated callers, so the JWKS is
+            # refetched at most once per interval, failed fetches included.
+            if key is None and time.monotonic() - self._refreshed_at >= JWKS_REFRESH_INTERVAL:
+                self._refreshed_at = time.monotonic()
+                self._keys = {k.key_id: k for k in self._jwks.get_signing_keys(refresh=True)}
+                key = self._keys.get(kid)
+        if key is None:
+            raise LookupError(f"unknown signing key: {kid}")
+        return key.key
+
+    def verify(self, token: str) -> bool:
+        key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        now = time.time()
+        with self._lock:
+            exp = self._valid.get(key)
+            if exp is not None:
+                if exp > now:
+                    return True
+                self._valid.pop(key, None)
+
+        try:
+            claims = self._jwt.decode(
+                token,
+                self._signing_key(token),
+                algorithms=["RS256"],
+                audience=self._config.audience,
+                issuer=self._config.issuer,
+                options={"require": ["exp", "aud", "iss"]},
+            )
+        except Exception:
+            return False
+
+        with self._lock:
+            if len(self._valid) >= VALID_TOKEN_CACHE_SIZE:
+                self._valid.pop(next(iter(self._valid)))
+            self._valid[key] = float(claims["exp"])
+        return True
+
+
+def load_jwt_verifier() -> Optional[JwtVerifier]:
+    config = BearerTokenAuthConfig.from_env()
+    if config is None:
+        return None
+    try:
+        return JwtVerifier(config)
+    except ImportError:
+        eprint("WARNING: MJYTDLP_JWT_JWKS_URL is set but PyJWT is not installed; JWT auth disabled.")
+        return None
@@ -1,185 +1,277 @@
 from __future__ import annotations
 
-import json
-import queue
+import heapq
+import os
 import threading
 import time
-import uuid
-from typing import Any, Dict, Iterable, List, Optional
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
 
 from flask import Blueprint, Response, jsonify, request
 
+from . import _json
 from .asr_tools import AsrError, transcribe
 from .mcp_settings import load_mcp_settings
 from .mcp_translate import ProviderError, translate_text
-from .yt_dlp_tools import YtDlpError, download_subs, formats, list_subs, probe, yt_dlp_version
+from .yt_dlp_tools import (
+    YtDlpError,
+    batch_probe,
+    download_subs,
+    download_subs_batch,
+    formats,
+    list_subs,
+    probe,
+    yt_dlp_version,
+)
 
 
 mcp_bp = Blueprint("mcp", __name__, url_prefix="/mcp")
 
-_SESSIONS: Dict[str, "_SseSession"] = {}
-_SESSIONS_LOCK = threading.Lock()
+_SESSION_SHARD_COUNT = 16
+_SESSION_SHARDS: List[Tuple[Dict[str, "_SseSession"], threading.Lock]] = [
+    ({}, threading.Lock()) for _ in range(_SESSION_SHARD_COUNT)
+]
 _SESSION_TTL = 60 * 60
+_EXPIRY_HEAP: List[Tuple[float, str]] = []
+_EXPIRY_LOCK = threading.Lock()
+
+
+class _MessageQueue:
+    def __init__(self) -> None:
+        self._items: Deque[Optional[Dict[str, Any]]] = deque()
+        self._ready = threading.Event()
+
+    def push(self, item: Optional[Dict[str, Any]]) -> None:
+        self._items.append(item)
+        self._ready.set()
+
+    def drain(self, timeout: float) -> List[Optional[Dict[str, Any]]]:
+        if not self._items:
+            self._ready.wait(timeout)
+        self._ready.clear()
+        items: List[Optional[Dict[str, Any]]] = []
+        while self._items:
+            items.append(self._items.popleft())
+        return items
 
 
 class _SseSession:
     def __init__(self, session_id: str) -> None:
         self.id = session_id
-        self.queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self.messages = _MessageQueue()
         self.created = time.time()
 
 
+def _shard_for(session_id: str) -> Tuple[Dict[str, _SseSession], threading.Lock]:
+    return _SESSION_SHARDS[hash(session_id) & (_SESSION_SHARD_COUNT - 1)]
+
+
 def _cleanup_sessions() -> None:
     now = time.time()
-    stale = []
-    with _SESSIONS_LOCK:
-        for sid, session in _SESSIONS.items():
-            if now - session.created > _SESSION_TTL:
-                stale.append(sid)
-        for sid in stale:
-            _SESSIONS.pop(sid, None)
+    expired: List[str] = []
+    with _EXPIRY_LOCK:
+        while _EXPIRY_HEAP and _EXPIRY_HEAP[0][0] <= now:
+            expired.append(heapq.heappop(_EXPIRY_HEAP)[1])
+    for sid in expired:
+        _remove_session(sid)
 
 
 def _register_session() -> _SseSession:
-    session_id = uuid.uuid4().hex
+    session_id = os.urandom(16).hex()
     session = _SseSession(session_id)
-    with _SESSIONS_LOCK:
-        _SESSIONS[session_id] = session
+    sessions, lock = _shard_for(session_id)
+    with lock:
+        sessions[session_id] = session
+    with _EXPIRY_LOCK:
+        heapq.heappush(_EXPIRY_HEAP, (session.created + _SESSION_TTL, session_id))
     _cleanup_sessions()
     return session
 
 
 def _get_session(session_id: str) -> Optional[_SseSession]:
-    with _SESSIONS_LOCK:
-        return _SESSIONS.get(session_id)
+    sessions, lock = _shard_for(session_id)
+    with lock:
+        return sessions.get(session_id)
 
 
 def _remove_session(session_id: str) -> None:
-    with _SESSIONS_LOCK:
-        _SESSIONS.pop(session_id, None)
+    sessions, lock = _shard_for(session_id)
+    with lock:
+        sessions.pop(session_id, None)
 
 
 def _jsonrpc_error(code: int, message: str, req_id: Any = None) -> Dict[str, Any]:
     return {"jsonrpc": "2.0", "id": req_id, "error": {"code": code, "message": message}}
 
 
-def _tool_schemas() -> List[Dict[str, Any]]:
-    options_schema = {
-        "type": "object",
-        "properties": {
-            "cookies_path": {"type": "string", "description": "cookies.txt 路径（可选）"},
-            "cookies_name": {"type": "string", "description": "命名 cookies（可选，如 youtube/douyin/bilibili）"},
-            "proxy": {"type": "string", "description": "代理地址（可选）"},
-            "user_agent": {"type": "string", "description": "自定义 User-Agent（可选）"},
-            "referer": {"type": "string", "description": "自定义 Referer（可选）"},
-            "timeout": {"type": "number", "description": "超时秒数（可选）"},
-        },
-    }
-
-    return [
-        {
-            "name": "translate",
-            "description": "文本翻译（使用已配置的 Provider）。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "text": {"type": "string", "description": "要翻译的文本"},
-                    "target": {"type": "string", "description": "目标语言，如 zh/en"},
-                    "source": {"type": "string", "description": "源语言（可选）"},
-                    "provider": {"type": "string", "description": "Provider id（可选）"},
-                    "model": {"type": "string", "description": "覆盖模型名（可选）"},
-                    "temperature": {"type": "number", "description": "采样温度（可选）"},
-                },
-                "required": ["text", "target"],
+_OPTIONS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "cookies_path": {"type": "string", "description": "cookies.txt 路径（可选）"},
+        "cookies_name": {"type": "string", "description": "命名 cookies（可选，如 youtube/douyin/bilibili）"},
+        "proxy": {"type": "string", "description": "代理地址（可选）"},
+        "user_agent": {"type": "string", "description": "自定义 User-Agent（可选）"},
+        "referer": {"type": "string", "description": "自定义 Referer（可选）"},
+        "timeout": {"type": "number", "description": "超时秒数（可选）"},
+    },
+}
+
+_NO_INPUT_SCHEMA: Dict[str, Any] = {"type": "object", "properties": {}}
+
+_TOOL_SCHEMAS: Tuple[Dict[str, Any], ...] = (
+    {
+        "name": "translate",
+        "description": "文本翻译（使用已配置的 Provider）。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "text": {"type": "string", "description": "要翻译的文本"},
+                "target": {"type": "string", "description": "目标语言，如 zh/en"},
+                "source": {"type": "string", "description": "源语言（可选）"},
+                "provider": {"type": "string", "description": "Provider id（可选）"},
+                "model": {"type": "string", "description": "覆盖模型名（可选）"},
+                "temperature": {"type": "number", "description": "采样温度（可选）"},
             },
+            "required": ["text", "target"],
         },
-        {
-            "name": "list_providers",
-            "description": "列出已配置的翻译 Provider（不含密钥）。",
-            "inputSchema": {"type": "object", "properties": {}},
+    },
+    {
+        "name": "list_providers",
+        "description": "列出已配置的翻译 Provider（不含密钥）。",
+        "inputSchema": _NO_INPUT_SCHEMA,
+    },
+    {
+        "name": "probe",
+        "description": "获取视频元数据（不下载文件）。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "视频链接"},
+                "full": {"type": "boolean", "description": "返回更完整字段"},
+                "options": _OPTIONS_SCHEMA,
+            },
+            "required": ["url"],
         },
-        {
-            "name": "probe",
-            "description": "获取视频元数据（不下载文件）。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "视频链接"},
-                    "full": {"type": "boolean", "description": "返回更完整字段"},
-                    "options": options_schema,
-                },
-                "required": ["url"],
+    },
+    {
+        "name": "batch_probe",
+        "description": "并发获取多个视频的元数据（单个失败不影响其他）。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "urls": {"type": "array", "items": {"type": "string"}, "description": "视频链接列表"},
+                "full": {"type": "boolean", "description": "返回更完整字段"},
+                "options": _OPTIONS_SCHEMA,
             },
+            "required": ["urls"],
         },
-        {
-            "name": "formats",
-            "description": "列出可用格式与下载直链（不下载文件）。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "视频链接"},
-                    "limit": {"type": "integer", "description": "最多返回的格式数量"},
-                    "options": options_schema,
-                },
-                "required": ["url"],
+    },
+    {
+        "name": "formats",
+        "description": "列出可用格式与下载直链（不下载文件）。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "视频链接"},
+                "limit": {"type": "integer", "description": "最多返回的格式数量"},
+                "options": _OPTIONS_SCHEMA,
             },
+            "required": ["url"],
         },
-        {
-            "name": "list_subs",
-            "description": "列出字幕轨道（含下载直链）。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "视频链接"},
-                    "langs": {"type": "array", "items": {"type": "string"}, "description": "仅返回这些语言"},
-                    "include_auto": {"type": "boolean", "description": "包含自动字幕"},
-                    "include_manual": {"type": "boolean", "description": "包含人工字幕"},
-                    "options": options_schema,
-                },
-                "required": ["url"],
+    },
+    {
+        "name": "list_subs",
+        "description": "列出字幕轨道（含下载直链）。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "视频链接"},
+                "langs": {"type": "array", "items": {"type": "string"}, "description": "仅返回这些语言"},
+                "include_auto": {"type": "boolean", "description": "包含自动字幕"},
+                "include_manual": {"type": "boolean", "description": "包含人工字幕"},
+                "options": _OPTIONS_SCHEMA,
             },
+            "required": ["url"],
         },
-        {
-            "name": "download_subs",
-            "description": "返回字幕文本或字幕直链（不落盘）。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "视频链接"},
-                    "lang": {"type": "string", "description": "语言，如 zh/en"},
-                    "format": {"type": "string", "description": "字幕格式，如 vtt/srt"},
-                    "auto": {"type": "boolean", "description": "是否使用自动字幕"},
-                    "link_only": {"type": "boolean", "description": "仅返回字幕下载链接"},
-                    "options": options_schema,
-                },
-                "required": ["url", "lang"],
+    },
+    {
+        "name": "download_subs",
+        "description": "返回字幕文本或字幕直链（不落盘）。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "视频链接"},
+                "lang": {"type": "string", "description": "语言，如 zh/en"},
+                "format": {"type": "string", "description": "字幕格式，如 vtt/srt"},
+                "auto": {"type": "boolean", "description": "是否使用自动字幕"},
+                "link_only": {"type": "boolean", "description": "仅返回字幕下载链接"},
+                "options": _OPTIONS_SCHEMA,
             },
+            "required": ["url", "lang"],
         },
-        {
-            "name": "transcribe",
-            "description": "转写音频为字幕/文本（通过外部 ASR 服务）。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "视频链接"},
-                    "output": {"type": "string", "description": "输出格式：srt/vtt/txt/json"},
-                    "language": {"type": "string", "description": "语言代码（可选）"},
-                    "task": {"type": "string", "description": "transcribe/translate"},
-                    "initial_prompt": {"type": "string", "description": "提示词（可选）"},
-                    "encode": {"type": "boolean", "description": "是否先转码（可选）"},
-                    "timeout": {"type": "integer", "description": "超时秒数（可选）"},
-                    "max_mb": {"type": "integer", "description": "最大下载体积（MB，可选）"},
-                    "options": options_schema,
-                },
-                "required": ["url"],
+    },
+    {
+        "name": "download_subs_batch",
+        "description": "并发下载同一视频的多种语言字幕文本（单个失败不影响其他）。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "视频链接"},
+                "langs": {"type": "array", "items": {"type": "string"}, "description": "语言列表，如 [\"zh\", \"en\"]"},
+                "format": {"type": "string", "description": "字幕格式，如 vtt/srt"},
+                "auto": {"type": "boolean", "description": "是否使用自动字幕"},
+                "options": _OPTIONS_SCHEMA,
             },
+            "required": ["url", "langs"],
         },
-        {
-            "name": "version",
-            "description": "获取 yt-dlp 版本。",
-            "inputSchema": {"type": "object", "properties": {}},
+    },
+    {
+        "name": "transcribe",
+        "description": "转写音频为字幕/文本（通过外部 ASR 服务）。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "视频链接"},
+                "output": {"type": "string", "description": "输出格式：srt/vtt/txt/json"},
+                "language": {"type": "string", "description": "语言代码（可选）"},
+                "task": {"type": "string", "description": "transcribe/translate"},
+                "initial_prompt": {"type": "string", "description": "提示词（可选）"},
+                "encode": {"type": "boolean", "description": "是否先转码（可选）"},
+                "timeout": {"type": "integer", "description": "超时秒数（可选）"},
+                "max_mb": {"type": "integer", "description": "最大下载体积（MB，可选）"},
+                "options": _OPTIONS_SCHEMA,
+            },
+            "required": ["url"],
         },
-    ]
+    },
+    {
+        "name": "version",
+        "description": "获取 yt-dlp 版本。",
+        "inputSchema": _NO_INPUT_SCHEMA,
+    },
+)
+
+_TOOLS_LIST_RESULT: Dict[str, Any] = {"tools": _TOOL_SCHEMAS}
+_EMPTY_RESULT: Dict[str, Any] = {}
+_RESOURCES_LIST_RESULT: Dict[str, Any] = {"resources": []}
+_PROMPTS_LIST_RESULT: Dict[str, Any] = {"prompts": []}
+
+_PREENCODED_RESULTS: Dict[int, str] = {
+    id(result): _json.dumps(result)
+    for result in (_TOOLS_LIST_RESULT, _EMPTY_RESULT, _RESOURCES_LIST_RESULT, _PROMPTS_LIST_RESULT)
+}
+
+
+def _encode_response(resp: Dict[str, Any]) -> str:
+    cached = _PREENCODED_RESULTS.get(id(resp.get("result")))
+    if cached is None:
+        return _json.dumps(resp)
+    req_id = _json.dumps(resp.get("id"))
+    return f'{{"jsonrpc":"2.0","id":{req_id},"result":{cached}}}'
+
+
+def _json_response(text: str) -> Response:
+    return Response(f"{text}\n", mimetype="application/json")
 
 
 def _safe_provider_list() -> Dict[str, Any]:
@@ -223,7 +315,39 @@ def _get_options(args: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def _json_content(payload: Any) -> Dict[str, Any]:
-    return {"content": [{"type": "text", "text": json.dumps(payload, ensure_ascii=False)}]}
+    return {"content": [{"type": "text", "text": _json.dumps(payload)}]}
+
+
+def _str(d: Dict[str, Any], key: str, default: Optional[str] = None) -> Optional[str]:
+    v = d.get(key)
+    return v if isinstance(v, str) else default
+
+
+def _int(d: Dict[str, Any], key: str) -> Optional[int]:
+    v = d.get(key)
+    return v if isinstance(v, int) else None
+
+
+def _num(d: Dict[str, Any], key: str) -> Optional[float]:
+    v = d.get(key)
+    return v if isinstance(v, (int, float)) else None
+
+
+def _bool(d: Dict[str, Any], key: str, default: Optional[bool] = None) -> Optional[bool]:
+    v = d.get(key)
+    return default if v is None else bool(v)
+
+
+def _list(d: Dict[str, Any], key: str) -> Optional[List[Any]]:
+    v = d.get(key)
+    return v if isinstance(v, list) else None
+
+
+def _require_url(args: Dict[str, Any]) -> str:
+    url = _str(args, "url", "").strip()
+    if not url:
+        raise ProviderError("缺少 url。")
+    return url
 
 
 def _handle_tools_call(params: Any) -> Dict[str, Any]:
@@ -238,12 +362,12 @@ def _handle_tools_call(params: Any) -> Dict[str, Any]:
 
     if name == "translate":
         result = translate_text(
-            text=args.get("text") or "",
-            target=args.get("target") or "",
-            source=args.get("source") if isinstance(args.get("source"), str) else None,
-            provider_id=args.get("provider") if isinstance(args.get("provider"), str) else None,
-            model_override=args.get("model") if isinstance(args.get("model"), str) else None,
-            temperature=args.get("temperature") if isinstance(args.get("temperature"), (int, float)) else None,
+            text=_str(args, "text", ""),
+            target=_str(args, "target", ""),
+            source=_str(args, "source"),
+            provider_id=_str(args, "provider"),
+            model_override=_str(args, "model"),
+            temperature=_num(args, "temperature"),
         )
         return {"content": [{"type": "text", "text": result.get("text") or ""}]}
 
@@ -251,79 +375,76 @@ def _handle_tools_call(params: Any) -> Dict[str, Any]:
         return _json_content(_safe_provider_list())
 
     if name == "probe":
-        url = args.get("url")
-        if not isinstance(url, str) or not url.strip():
-            raise ProviderError("缺少 url。")
-        full = bool(args.get("full"))
-        result = probe(url.strip(), _get_options(args), full=full)
-        return _json_content(result)
+        url = _require_url(args)
+        return _json_content(probe(url, _get_options(args), full=_bool(args, "full", False)))
+
+    if name == "batch_probe":
+        urls = [u.strip() for u in _list(args, "urls") or [] if isinstance(u, str) and u.strip()]
+        if not urls:
+            raise ProviderError("缺少 urls。")
+        results = batch_probe(urls, _get_options(args), full=_bool(args, "full", False))
+        return _json_content({"results": results})
 
     if name == "formats":
-        url = args.get("url")
-        if not isinstance(url, str) or not url.strip():
-            raise ProviderError("缺少 url。")
-        limit = args.get("limit")
-        limit_val = int(limit) if isinstance(limit, int) and limit > 0 else None
-        result = formats(url.strip(), _get_options(args), limit=limit_val)
+        url = _require_url(args)
+        limit = _int(args, "limit")
+        result = formats(url, _get_options(args), limit=limit if limit and limit > 0 else None)
         return _json_content(result)
 
     if name == "list_subs":
-        url = args.get("url")
-        if not isinstance(url, str) or not url.strip():
-            raise ProviderError("缺少 url。")
-        langs = args.get("langs") if isinstance(args.get("langs"), list) else None
-        include_auto = True if args.get("include_auto") is None else bool(args.get("include_auto"))
-        include_manual = True if args.get("include_manual") is None else bool(args.get("include_manual"))
+        url = _require_url(args)
         result = list_subs(
-            url.strip(),
+            url,
             _get_options(args),
-            include_auto=include_auto,
-            include_manual=include_manual,
-            langs=langs,
+            include_auto=_bool(args, "include_auto", True),
+            include_manual=_bool(args, "include_manual", True),
+            langs=_list(args, "langs"),
         )
         return _json_content(result)
 
     if name == "download_subs":
-        url = args.get("url")
-        lang = args.get("lang")
-        if not isinstance(url, str) or not url.strip():
-            raise ProviderError("缺少 url。")
-        if not isinstance(lang, str) or not lang.strip():
+        url = _require_url(args)
+        lang = _str(args, "lang", "").strip()
+        if not lang:
             raise ProviderError("缺少 lang。")
-        fmt = args.get("format") if isinstance(args.get("format"), str) else None
-        auto = args.get("auto") if isinstance(args.get("auto"), bool) else None
-        link_only = bool(args.get("link_only"))
+        auto = args.get("auto")
         result = download_subs(
-            url.strip(),
-            lang.strip(),
+            url,
+            lang,
             _get_options(args),
-            fmt=fmt,
-            auto=auto,
-            link_only=link_only,
+            fmt=_str(args, "format"),
+            auto=auto if isinstance(auto, bool) else None,
+            link_only=_bool(args, "link_only", False),
         )
         return _json_content(result)
 
+    if name == "download_subs_batch":
+        url = _require_url(args)
+        langs = [lang.strip() for lang in _list(args, "langs") or [] if isinstance(lang, str) and lang.strip()]
+        if not langs:
+            raise ProviderError("缺少 langs。")
+        auto = args.get("auto")
+        results = download_subs_batch(
+            url,
+            langs,
+            _get_options(args),
+            fmt=_str(args, "format"),
+            auto=auto if isinstance(auto, bool) else None,
+        )
+        return _json_content({"results": results})
+
     if name == "transcribe":
-        url = args.get("url")
-        if not isinstance(url, str) or not url.strip():
-            raise ProviderError("缺少 url。")
-        output = args.get("output") if isinstance(args.get("output"), str) else "srt"
-        language = args.get("language") if isinstance(args.get("language"), str) else None
-        task = args.get("task") if isinstance(args.get("task"), str) else "transcribe"
-        initial_prompt = args.get("initial_prompt") if isinstance(args.get("initial_prompt"), str) else None
-        encode = True if args.get("encode") is None else bool(args.get("encode"))
-        timeout = args.get("timeout") if isinstance(args.get("timeout"), int) else None
-        max_mb = args.get("max_mb") if isinstance(args.get("max_mb"), int) else None
+        url = _require_url(args)
         result = transcribe(
-            url.strip(),
+            url,
             _get_options(args),
-            output=output,
-            language=language,
-            task=task,
-            initial_prompt=initial_prompt,
-            encode=encode,
-            timeout=timeout,
-            max_mb=max_mb,
+            output=_str(args, "output", "srt"),
+            language=_str(args, "language"),
+            task=_str(args, "task", "transcribe"),
+            initial_prompt=_str(args, "initial_prompt"),
+            encode=_bool(args, "encode", True),
+            timeout=_int(args, "timeout"),
+            max_mb=_int(args, "max_mb"),
         )
         return _json_content(result)
 
@@ -333,6 +454,23 @@ def _handle_tools_call(params: Any) -> Dict[str, Any]:
     raise ProviderError(f"未知工具: {name}")
 
 
+def _rpc_result(req_id: Any, result: Dict[str, Any]) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": req_id, "result": result}
+
+
+_NOTIFICATION_PREFIX = "notifications/"
+
+_METHOD_TABLE: Dict[str, Callable[[Any, Any], Dict[str, Any]]] = {
+    "initialize": lambda req_id, params: _rpc_result(req_id, _handle_initialize(params)),
+    "ping": lambda req_id, params: _rpc_result(req_id, _EMPTY_RESULT),
+    "tools/list": lambda req_id, params: _rpc_result(req_id, _TOOLS_LIST_RESULT),
+    "tools/call": lambda req_id, params: _rpc_result(req_id, _handle_tools_call(params)),
+    "resources/list": lambda req_id, params: _rpc_result(req_id, _RESOURCES_LIST_RESULT),
+    "prompts/list": lambda req_id, params: _rpc_result(req_id, _PROMPTS_LIST_RESULT),
+    "prompts/get": lambda req_id, params: _jsonrpc_error(-32601, "Prompt not found", req_id),
+}
+
+
 def _handle_rpc_message(message: Any) -> Optional[Dict[str, Any]]:
     if not isinstance(message, dict):
         return _jsonrpc_error(-32600, "Invalid Request", None)
@@ -346,26 +484,14 @@ def _handle_rpc_message(message: Any) -> Optional[Dict[str, Any]]:
     if not isinstance(method, str):
         return _jsonrpc_error(-32600, "Invalid Request", req_id)
 
-    if method.startswith("notifications/"):
+    if method.startswith(_NOTIFICATION_PREFIX):
         return None
 
-    try:
-        if method == "initialize":
-            return {"jsonrpc": "2.0", "id": req_id, "result": _handle_initialize(params)}
-        if method == "ping":
-            return {"jsonrpc": "2.0", "id": req_id, "result": {}}
-        if method == "tools/list":
-            return {"jsonrpc": "2.0", "id": req_id, "result": {"tools": _tool_schemas()}}
-        if method == "tools/call":
-            result = _handle_tools_call(params)
-            return {"jsonrpc": "2.0", "id": req_id, "result": result}
-        if method == "resources/list":
-            return {"jsonrpc": "2.0", "id": req_id, "result": {"resources": []}}
-        if method == "prompts/list":
-            return {"jsonrpc": "2.0", "id": req_id, "result": {"prompts": []}}
-        if method == "prompts/get":
-            return _jsonrpc_error(-32601, "Prompt not found", req_id)
+    handler = _METHOD_TABLE.get(method)
+    if handler is None:
         return _jsonrpc_error(-32601, "Method not found", req_id)
+    try:
+        return handler(req_id, params)
     except (ProviderError, YtDlpError, AsrError) as exc:
         return {
             "jsonrpc": "2.0",
@@ -409,15 +535,21 @@ def sse() -> Response:
             endpoint = f"/mcp/messages/{session.id}"
             yield f"event: endpoint\ndata: {endpoint}\n\n"
             while True:
-                try:
-                    item = session.queue.get(timeout=15)
-                except queue.Empty:
+                items = session.messages.drain(timeout=15)
+                if not items:
                     yield ": keepalive\n\n"
                     continue
-                if item is None:
-                    break
-                payload = json.dumps(item, ensure_ascii=False)
-                yield f"event: message\ndata: {payload}\n\n"
+                frames = []
+                closed = False
+                for item in items:
+                    if item is None:
+                        closed = True
+                        break
+                    frames.append(f"event: message\ndata: {_encode_response(item)}\n\n")
+                if frames:
+                    yield "".join(frames)
+                if closed:
+                    return
         finally:
             _remove_session(session.id)
 
@@ -437,7 +569,7 @@ def sse_messages(session_id: str) -> Response:
 
     responses = _handle_rpc_payload(payload)
     for resp in responses:
-        session.queue.put(resp)
+        session.messages.push(resp)
 
     return jsonify({"ok": True})
 
@@ -454,14 +586,12 @@ def streamable_http() -> Response:
 
     if wants_stream:
         def _stream() -> Iterable[str]:
-            for resp in responses:
-                payload_text = json.dumps(resp, ensure_ascii=False)
-                yield f"data: {payload_text}\n\n"
+            yield "".join(f"data: {_encode_response(resp)}\n\n" for resp in responses)
         headers = {"Cache-Control": "no-cache", "Connection": "keep-alive"}
         return Response(_stream(), mimetype="text/event-stream", headers=headers)
 
     if not responses:
         return Response(status=204)
     if isinstance(payload, list):
-        return jsonify(responses)
-    return jsonify(responses[0])
+        return _json_response("[" + ",".join(_encode_response(resp) for resp in responses) + "]")
+    return _json_response(_encode_response(responses[0]))
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, List, Optional
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 
 from .utils import get_data_dir, read_json, write_json_atomic
 
@@ -13,6 +14,9 @@ DEFAULT_MCP_SETTINGS: Dict[str, Any] = {
     "providers": [],
 }
 
+_SETTINGS_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, Any], Dict[str, Dict[str, Any]]]] = {}
+_SETTINGS_CACHE_LOCK = threading.Lock()
+
 
 def settings_path(home_dir: Optional[str] = None) -> str:
     base = home_dir or get_data_dir()
@@ -40,14 +44,8 @@ def _as_str(value: Any) -> str:
 def _sanitize_headers(raw: Any) -> Dict[str, str]:
     if not isinstance(raw, dict):
         return {}
-    out: Dict[str, str] = {}
-    for k, v in raw.items():
-        if isinstance(k, str) and isinstance(v, str):
-            kk = k.strip()
-            vv = v.strip()
-            if kk and vv:
-                out[kk] = vv
-    return out
+    stripped = ((k.strip(), v.strip()) for k, v in raw.items() if isinstance(k, str) and isinstance(v, str))
+    return {k: v for k, v in stripped if k and v}
 
 
 def _sanitize_provider(raw: Any) -> Optional[Dict[str, Any]]:
@@ -67,7 +65,7 @@ def _sanitize_provider(raw: Any) -> Optional[Dict[str, Any]]:
         timeout = float(timeout_val)
     elif isinstance(timeout_val, str):
         try:
-            parsed = float(timeout_val.strip())
+            parsed = float(timeout_val)
             if parsed > 0:
                 timeout = parsed
         except Exception:
@@ -81,8 +79,8 @@ def _sanitize_provider(raw: Any) -> Optional[Dict[str, Any]]:
         "model": _as_str(raw.get("model")),
         "api_key": _as_str(raw.get("api_key")),
         "api_key_env": _as_str(raw.get("api_key_env")),
-        "auth_header": _as_str(auth_header_raw) if isinstance(auth_header_raw, str) else "Authorization",
-        "auth_prefix": _as_str(auth_prefix_raw) if isinstance(auth_prefix_raw, str) else "Bearer ",
+        "auth_header": auth_header_raw.strip() if isinstance(auth_header_raw, str) else "Authorization",
+        "auth_prefix": auth_prefix_raw if isinstance(auth_prefix_raw, str) else "Bearer ",
         "extra_headers": _sanitize_headers(raw.get("extra_headers")),
         "timeout": timeout,
         "enabled": True if enabled is None else enabled,
@@ -90,7 +88,7 @@ def _sanitize_provider(raw: Any) -> Optional[Dict[str, Any]]:
     return provider
 
 
-def _sanitize_settings(raw: Any) -> Dict[str, Any]:
+def _sanitize_settings(raw: Any, clean: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
     if not isinstance(raw, dict):
         return dict(DEFAULT_MCP_SETTINGS)
 
@@ -99,7 +97,10 @@ def _sanitize_settings(raw: Any) -> Dict[str, Any]:
     seen = set()
     if isinstance(providers_raw, list):
         for entry in providers_raw:
-            provider = _sanitize_provider(entry)
+            # An entry equal to its cached sanitized form is already clean.
+            pid = entry.get("id") if clean and isinstance(entry, dict) else None
+            known = clean.get(pid) if isinstance(pid, str) else None
+            provider = entry if known is not None and entry == known else _sanitize_provider(entry)
             if not provider:
                 continue
             pid = provider["id"]
@@ -118,16 +119,61 @@ def _sanitize_settings(raw: Any) -> Dict[str, Any]:
     }
 
 
-def load_mcp_settings(home_dir: Optional[str] = None) -> Dict[str, Any]:
+def providers_by_id(settings: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    providers = settings.get("providers") if isinstance(settings.get("providers"), list) else []
+    return {p["id"]: p for p in providers if isinstance(p, dict) and isinstance(p.get("id"), str)}
+
+
+def _with_base_headers(provider: Dict[str, Any]) -> Dict[str, Any]:
+    base = {"Content-Type": "application/json", **provider["extra_headers"]}
+    return {**provider, "_base_headers": base}
+
+
+def _load_cached(home_dir: Optional[str]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
     path = settings_path(home_dir)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {**DEFAULT_MCP_SETTINGS, "providers": []}, {}
+    key = (st.st_mtime_ns, st.st_size)
+
+    with _SETTINGS_CACHE_LOCK:
+        cached = _SETTINGS_CACHE.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1], cached[2]
+
     raw = read_json(path)
-    if raw is None:
-        return dict(DEFAULT_MCP_SETTINGS)
-    return _sanitize_settings(raw)
+    settings = _sanitize_settings(raw) if raw is not None else {**DEFAULT_MCP_SETTINGS, "providers": []}
+    index = {pid: _with_base_headers(p) for pid, p in providers_by_id(settings).items()}
+    with _SETTINGS_CACHE_LOCK:
+        _SETTINGS_CACHE[path] = (key, settings, index)
+    return settings, index
+
+
+def load_mcp_settings(home_dir: Optional[str] = None) -> Dict[str, Any]:
+    settings, _ = _load_cached(home_dir)
+    # Callers edit providers in place, so they get copies rather than the cached dicts.
+    providers = [{**p, "extra_headers": dict(p["extra_headers"])} for p in settings["providers"]]
+    return {**settings, "providers": providers}
 
 
-def save_mcp_settings(settings: Dict[str, Any], home_dir: Optional[str] = None) -> bool:
+def find_provider(
+    provider_id: Optional[str], home_dir: Optional[str] = None
+) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    settings, index = _load_cached(home_dir)
+    chosen = provider_id or settings.get("default_provider")
+    if not chosen:
+        return None, None
+    return chosen, index.get(chosen)
+
+
+def save_mcp_settings(settings: Dict[str, Any], home_dir: Optional[str] = None) -> Optional[Dict[str, Any]]:
     path = settings_path(home_dir)
-    sanitized = _sanitize_settings(settings)
+    with _SETTINGS_CACHE_LOCK:
+        cached = _SETTINGS_CACHE.pop(path, None)
+    clean = {p["id"]: p for p in cached[1]["providers"]} if cached is not None else None
+    sanitized = _sanitize_settings(settings, clean)
     payload = {**DEFAULT_MCP_SETTINGS, **sanitized}
-    return write_json_atomic(path, payload)
+    if not write_json_atomic(path, payload):
+        return None
+    return payload
@@ -1,31 +1,34 @@
 from __future__ import annotations
 
-import json
+import http.cookiejar
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from .mcp_settings import load_mcp_settings
+from . import _json
+from .mcp_settings import find_provider
 
 
 DEFAULT_TIMEOUT = 30
 
 
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+_HTTP_SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+# Shared by all providers for connection pooling only; never keep cookies.
+_HTTP_SESSION.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+
+
 class ProviderError(Exception):
     pass
 
 
 def _resolve_provider(provider_id: Optional[str]) -> Dict[str, Any]:
-    settings = load_mcp_settings()
-    providers = settings.get("providers") if isinstance(settings.get("providers"), list) else []
-    default_provider = settings.get("default_provider")
-
-    chosen = provider_id or default_provider
+    chosen, provider = find_provider(provider_id)
     if not chosen:
         raise ProviderError("No provider configured. Set default_provider in MCP settings.")
-
-    provider = next((p for p in providers if isinstance(p, dict) and p.get("id") == chosen), None)
     if not provider:
         raise ProviderError(f"Provider not found: {chosen}")
     if not provider.get("enabled", True):
@@ -46,51 +49,70 @@ def _provider_endpoint(provider: Dict[str, Any]) -> str:
 
 
 def _provider_headers(provider: Dict[str, Any]) -> Dict[str, str]:
-    headers: Dict[str, str] = {"Content-Type": "application/json"}
-    extra = provider.get("extra_headers")
-    if isinstance(extra, dict):
-        for k, v in extra.items():
-            if isinstance(k, str) and isinstance(v, str):
-                kk = k.strip()
-                vv = v.strip()
-                if kk and vv:
-                    headers[kk] = vv
-
-    api_key_env = (provider.get("api_key_env") or "").strip()
-    api_key = os.getenv(api_key_env) if api_key_env else (provider.get("api_key") or "")
-    api_key = api_key.strip() if isinstance(api_key, str) else ""
-    auth_header = provider.get("auth_header")
-    auth_prefix = provider.get("auth_prefix")
-    if api_key and isinstance(auth_header, str) and auth_header:
-        prefix = auth_prefix if isinstance(auth_prefix, str) else "Bearer "
-        headers[auth_header] = f"{prefix}{api_key}"
+    headers: Dict[str, str] = dict(provider["_base_headers"])
+    api_key_env = provider["api_key_env"]
+    api_key = (os.getenv(api_key_env) or "").strip() if api_key_env else provider["api_key"]
+    auth_header = provider["auth_header"]
+    if api_key and auth_header:
+        headers[auth_header] = f"{provider['auth_prefix']}{api_key}"
     return headers
 
 
-def _extract_text(data: Dict[str, Any]) -> str:
+def _extract_chat(data: Dict[str, Any]) -> str:
     choices = data.get("choices")
-    if isinstance(choices, list) and choices:
-        first = choices[0]
-        if isinstance(first, dict):
-            message = first.get("message")
-            if isinstance(message, dict) and isinstance(message.get("content"), str):
-                return message.get("content") or ""
-            if isinstance(first.get("text"), str):
-                return first.get("text") or ""
-    if isinstance(data.get("output_text"), str):
-        return data.get("output_text") or ""
+    if not isinstance(choices, list) or not choices:
+        return ""
+    first = choices[0]
+    if not isinstance(first, dict):
+        return ""
+    message = first.get("message")
+    content = message.get("content") if isinstance(message, dict) else None
+    if isinstance(content, str):
+        return content
+    text = first.get("text")
+    return text if isinstance(text, str) else ""
+
+
+def _extract_responses(data: Dict[str, Any]) -> str:
+    output_text = data.get("output_text")
+    if isinstance(output_text, str):
+        return output_text
     output = data.get("output")
-    if isinstance(output, list):
-        parts = []
-        for item in output:
-            if isinstance(item, dict) and item.get("type") == "message":
-                content = item.get("content")
-                if isinstance(content, list):
-                    for part in content:
-                        if isinstance(part, dict) and isinstance(part.get("text"), str):
-                            parts.append(part.get("text"))
-        if parts:
-            return "".join(parts)
+    if not isinstance(output, list):
+        return ""
+    parts = []
+    for item in output:
+        if isinstance(item, dict) and item.get("type") == "message":
+            content = item.get("content")
+            if isinstance(content, list):
+                for part in content:
+                    if isinstance(part, dict) and isinstance(part.get("text"), str):
+                        parts.append(part["text"])
+    return "".join(parts)
+
+
+_EXTRACTORS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "chat": _extract_chat,
+    "responses": _extract_responses,
+}
+
+
+def _extract_text(provider: Dict[str, Any], data: Any) -> str:
+    if not isinstance(data, dict):
+        return ""
+    # The shape that worked last time is tried first; it resets on settings reload.
+    shape = provider.get("_response_shape")
+    if shape:
+        text = _EXTRACTORS[shape](data)
+        if text:
+            return text
+    for name, extractor in _EXTRACTORS.items():
+        if name == shape:
+            continue
+        text = extractor(data)
+        if text:
+            provider["_response_shape"] = name
+            return text
     return ""
 
 
@@ -142,14 +164,14 @@ def translate_text(
     headers = _provider_headers(provider)
 
     try:
-        resp = requests.post(endpoint, headers=headers, json=payload, timeout=timeout)
+        resp = _HTTP_SESSION.post(endpoint, headers=headers, data=_json.dumps_bytes(payload), timeout=timeout)
     except requests.RequestException as exc:
         raise ProviderError(f"Provider request failed: {exc}") from exc
 
     if resp.status_code >= 400:
         message = f"Provider error ({resp.status_code})"
         try:
-            data = resp.json()
+            data = _json.loads(resp.content)
             if isinstance(data, dict) and isinstance(data.get("error"), dict):
                 msg = data["error"].get("message")
                 if isinstance(msg, str) and msg:
@@ -159,7 +181,7 @@ def translate_text(
         raise ProviderError(message)
 
     try:
-        data = resp.json()
+        data = _json.loads(resp.content)
     except ValueError as exc:
         raise ProviderError("Provider returned non-JSON response.") from exc
 
@@ -167,9 +189,10 @@ def translate_text(
         msg = data["error"].get("message")
         raise ProviderError(msg if isinstance(msg, str) and msg else "Provider returned error.")
 
-    translated = _extract_text(data)
+    translated = _extract_text(provider, data)
     if not translated:
-        translated = json.dumps(data, ensure_ascii=False)
+        keys = list(data)[:6] if isinstance(data, dict) else type(data).__name__
+        raise ProviderError(f"Provider returned no translatable content (keys: {keys}).")
 
     return {
         "text": translated,
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-import json
 import os
-import tempfile
 import sys
-from typing import Any, Dict, Optional
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+from . import _json
 
 
 def eprint(*args, **kwargs) -> None:
@@ -20,8 +23,8 @@ def get_data_dir() -> str:
 
 def read_json(path: str) -> Optional[Dict[str, Any]]:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(path, "rb") as f:
+            data = _json.loads(f.read())
         return data if isinstance(data, dict) else None
     except FileNotFoundError:
         return None
@@ -37,27 +40,38 @@ def write_json_atomic(path: str, data: Dict[str, Any]) -> bool:
         eprint(f"ERROR: unable to create data directory {folder}: {exc}")
         return False
 
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
     try:
-        with tempfile.NamedTemporaryFile(
-            "w",
-            encoding="utf-8",
-            dir=folder,
-            prefix=os.path.basename(path) + ".",
-            suffix=".tmp",
-            delete=False,
-        ) as fp:
-            if hasattr(os, "fchmod"):
-                os.fchmod(fp.fileno(), 0o600)
-            json.dump(data, fp, indent=2, ensure_ascii=False)
-            fp.write("\n")
-            tmp_path = fp.name
+        payload = _json.dumps_bytes(data, indent=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o600)
+        try:
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
         os.replace(tmp_path, path)
         return True
     except Exception as exc:
         eprint(f"ERROR: unable to write {path}: {exc}")
         try:
-            if "tmp_path" in locals() and os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-        except Exception:
+            os.unlink(tmp_path)
+        except OSError:
             pass
         return False
+
+
+@contextmanager
+def open_atomic(path: str) -> Iterator[BinaryIO]:
+    folder = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            yield fp
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -1,28 +1,104 @@
 from __future__ import annotations
 
-import json
+import atexit
+import hashlib
+import http.cookiejar
 import os
-import re
-from typing import Any, Dict, List, Optional, Tuple
+import sqlite3
+import string
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
 
 import requests
 import yt_dlp
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from .utils import get_data_dir
+from . import _json
+from .utils import eprint, get_data_dir
+
+try:
+    _YT_DLP_VERSION = yt_dlp.version.__version__
+except Exception:
+    _YT_DLP_VERSION = getattr(yt_dlp, "__version__", None)
 
 DEFAULT_TIMEOUT = 30
+BATCH_PROBE_MAX_WORKERS = 8
+SUBS_BATCH_MAX_WORKERS = 10
+PLAYLIST_SCAN_LIMIT = 64
+LIGHTWEIGHT_RESOLVE_HOPS = 3
+DEFAULT_HOST_DELAY = 0.2
+HOST_DELAYS = (
+    ("youtube.com", 0.25),
+    ("youtu.be", 0.25),
+    ("bilibili.com", 0.4),
+    ("b23.tv", 0.4),
+)
+COOKIES_ISFILE_TTL = 2.0
+
+_DEFAULT_SUB_FORMATS = ("vtt", "srt", "srv3", "srv2", "srv1", "ttml")
+
+
+class _KeepOnly(dict):
+    # str.translate table: listed code points map to themselves, everything else is deleted.
+    def __missing__(self, key: int) -> None:
+        return None
+
+
+_COOKIE_NAME_TRANS = _KeepOnly((ord(c), ord(c)) for c in string.ascii_letters + string.digits + "_-")
+
+_ISFILE_CACHE: Dict[str, Tuple[float, bool]] = {}
+INFO_CACHE_TTL = 60
+INFO_CACHE_SIZE = 32
+
+_INFO_CACHE: "OrderedDict[Tuple[Any, ...], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_INFO_CACHE_LOCK = threading.Lock()
+
+DEFAULT_DISK_CACHE_TTL = 3600
+DISK_CACHE_FILENAME = "info_cache.sqlite"
+
+_DISK_CACHE: Optional["_DiskInfoCache"] = None
+_DISK_CACHE_CHECKED = False
+_DISK_CACHE_LOCK = threading.Lock()
+
+YDL_POOL_KEYS = 8
+YDL_POOL_IDLE_PER_KEY = 2
+
+# Idle YoutubeDL instances per options fingerprint; an instance is only used by one thread at a time.
+_YDL_POOL: "OrderedDict[str, List[yt_dlp.YoutubeDL]]" = OrderedDict()
+_YDL_POOL_LOCK = threading.Lock()
+# Bumped by reset_ydl_pool; instances checked out before a reset are not re-pooled.
+_YDL_POOL_GENERATION = 0
+_COOKIE_SAVE_LOCK = threading.Lock()
+
+_HTTP_RETRY = Retry(total=2, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=_HTTP_RETRY))
+_HTTP_SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=_HTTP_RETRY))
+# Shared across sites and callers for connection pooling only; never keep cookies.
+_HTTP_SESSION.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
 
 
 class YtDlpError(Exception):
     pass
 
 
+@lru_cache(maxsize=1)
 def _default_cookies_path() -> str:
     return os.path.join(get_data_dir(), "cookies.txt")
 
 
+@lru_cache(maxsize=128)
 def _named_cookies_path(name: str) -> str:
-    safe = re.sub(r"[^a-zA-Z0-9_-]", "", name).strip()
+    safe = name.translate(_COOKIE_NAME_TRANS)
     if not safe:
         return ""
     if not safe.endswith(".txt"):
@@ -30,105 +106,491 @@ def _named_cookies_path(name: str) -> str:
     return os.path.join(get_data_dir(), "cookies", safe)
 
 
-def _latest_named_cookies_path() -> str:
-    folder = os.path.join(get_data_dir(), "cookies")
-    try:
-        if not os.path.isdir(folder):
-            return ""
+def _isfile_cached(path: str) -> bool:
+    now = time.monotonic()
+    cached = _ISFILE_CACHE.get(path)
+    if cached is not None and now - cached[0] < COOKIES_ISFILE_TTL:
+        return cached[1]
+    result = os.path.isfile(path)
+    if len(_ISFILE_CACHE) >= 256:
+        _ISFILE_CACHE.clear()
+    _ISFILE_CACHE[path] = (now, result)
+    return result
+
+
+class _CookieDirIndex:
+    def __init__(self, root: str) -> None:
+        self.root = root
+        # (directory mtime_ns, present .txt paths, newest .txt path); replaced as a whole on refresh.
+        self._state: Tuple[Optional[int], FrozenSet[str], str] = (None, frozenset(), "")
+
+    def refresh(self) -> Tuple[FrozenSet[str], str]:
+        try:
+            mtime_ns = os.stat(self.root).st_mtime_ns
+        except OSError:
+            self._state = (None, frozenset(), "")
+            return self._state[1], self._state[2]
+        if mtime_ns == self._state[0]:
+            return self._state[1], self._state[2]
+
+        files = set()
         newest_path = ""
         newest_mtime = -1.0
-        for filename in os.listdir(folder):
-            if not filename.endswith(".txt"):
-                continue
-            path = os.path.join(folder, filename)
-            if not os.path.isfile(path):
-                continue
-            try:
-                mtime = os.path.getmtime(path)
-            except Exception:
-                continue
-            if mtime > newest_mtime:
-                newest_mtime = mtime
-                newest_path = path
-        return newest_path
-    except Exception:
-        return ""
-
-
-def _build_ydl_opts(options: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            with os.scandir(self.root) as it:
+                for entry in it:
+                    if not entry.name.endswith(".txt"):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        mtime = entry.stat().st_mtime
+                    except OSError:
+                        continue
+                    files.add(entry.path)
+                    if mtime > newest_mtime:
+                        newest_mtime = mtime
+                        newest_path = entry.path
+        except OSError:
+            return frozenset(), ""
+        self._state = (mtime_ns, frozenset(files), newest_path)
+        return self._state[1], self._state[2]
+
+
+@lru_cache(maxsize=1)
+def _cookie_dir_index() -> _CookieDirIndex:
+    return _CookieDirIndex(os.path.join(get_data_dir(), "cookies"))
+
+
+@dataclass(frozen=True, slots=True)
+class ExtractOptions:
+    cookies_path: str = ""
+    cookies_name: str = ""
+    proxy: str = ""
+    user_agent: str = ""
+    referer: str = ""
+    timeout: int = 0
+
+
+def _opt_str(raw: Dict[str, Any], key: str) -> str:
+    value = raw.get(key)
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _parse_options(raw: Any) -> ExtractOptions:
+    if isinstance(raw, ExtractOptions):
+        return raw
+    if not isinstance(raw, dict):
+        return ExtractOptions()
+    timeout = raw.get("timeout")
+    return ExtractOptions(
+        cookies_path=_opt_str(raw, "cookies_path"),
+        cookies_name=_opt_str(raw, "cookies_name"),
+        proxy=_opt_str(raw, "proxy"),
+        user_agent=_opt_str(raw, "user_agent"),
+        referer=_opt_str(raw, "referer"),
+        timeout=int(timeout) if isinstance(timeout, (int, float)) and timeout > 0 else 0,
+    )
+
+
+def _build_ydl_opts(options: ExtractOptions) -> Dict[str, Any]:
     opts: Dict[str, Any] = {
         "skip_download": True,
         "quiet": True,
         "no_warnings": True,
         "nocheckcertificate": True,
         "noplaylist": True,
+        "playlist_items": "1",
         "cachedir": False,
     }
 
-    cookies_path = (options.get("cookies_path") or "").strip() if isinstance(options.get("cookies_path"), str) else ""
-    cookies_name = (options.get("cookies_name") or "").strip() if isinstance(options.get("cookies_name"), str) else ""
+    cookies_path = options.cookies_path
     if not cookies_path:
-        if cookies_name:
-            named_path = _named_cookies_path(cookies_name)
-            if named_path and os.path.isfile(named_path):
+        named_files, latest_named = _cookie_dir_index().refresh()
+        if options.cookies_name:
+            named_path = _named_cookies_path(options.cookies_name)
+            if named_path and named_path in named_files:
                 cookies_path = named_path
         if not cookies_path:
             default_path = _default_cookies_path()
-            if os.path.isfile(default_path):
+            if _isfile_cached(default_path):
                 cookies_path = default_path
         if not cookies_path:
-            latest_named = _latest_named_cookies_path()
-            if latest_named:
-                cookies_path = latest_named
+            cookies_path = latest_named
     if cookies_path:
         opts["cookiefile"] = cookies_path
 
-    proxy = (options.get("proxy") or "").strip() if isinstance(options.get("proxy"), str) else ""
-    if proxy:
-        opts["proxy"] = proxy
+    if options.proxy:
+        opts["proxy"] = options.proxy
 
     http_headers: Dict[str, str] = {}
-    user_agent = (options.get("user_agent") or "").strip() if isinstance(options.get("user_agent"), str) else ""
-    referer = (options.get("referer") or "").strip() if isinstance(options.get("referer"), str) else ""
-    if user_agent:
-        http_headers["User-Agent"] = user_agent
-    if referer:
-        http_headers["Referer"] = referer
+    if options.user_agent:
+        http_headers["User-Agent"] = options.user_agent
+    if options.referer:
+        http_headers["Referer"] = options.referer
     if http_headers:
         opts["http_headers"] = http_headers
 
-    timeout = options.get("timeout")
-    if isinstance(timeout, (int, float)) and timeout > 0:
-        opts["socket_timeout"] = int(timeout)
+    if options.timeout:
+        opts["socket_timeout"] = options.timeout
 
     return opts
 
 
-def _extract_info(url: str, options: Dict[str, Any]) -> Dict[str, Any]:
-    opts = _build_ydl_opts(options)
+def _cookie_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _jar_snapshot(ydl: yt_dlp.YoutubeDL) -> int:
+    return hash(frozenset((c.domain, c.path, c.name, c.value, c.expires or 0) for c in ydl.cookiejar))
+
+
+def _persist_cookies(ydl: yt_dlp.YoutubeDL) -> bool:
+    """Write rotated cookies back; False if cookies.txt changed since the jar was loaded."""
+    stamp = getattr(ydl, "_mjyt_cookie_stamp", None)
+    cookiefile = ydl.params.get("cookiefile")
+    if stamp is None or not cookiefile:
+        return True
+    snapshot = _jar_snapshot(ydl)
+    with _COOKIE_SAVE_LOCK:
+        if _cookie_stamp(cookiefile) != stamp:
+            return False
+        if snapshot == ydl._mjyt_cookie_snapshot:
+            return True
+        try:
+            ydl.save_cookies()
+        except Exception as exc:
+            eprint(f"WARNING: unable to save cookies to {cookiefile}: {exc}")
+            return True
+        ydl._mjyt_cookie_stamp = _cookie_stamp(cookiefile)
+    ydl._mjyt_cookie_snapshot = snapshot
+    return True
+
+
+def _close_ydl(ydl: yt_dlp.YoutubeDL) -> None:
+    # Cookies are saved by _persist_cookies on release; close() would save
+    # unconditionally over a newer cookies.txt or recreate a deleted one.
+    ydl.params["cookiefile"] = None
     try:
-        with yt_dlp.YoutubeDL(opts) as ydl:
-            info = ydl.extract_info(url, download=False)
+        ydl.close()
+    except Exception:
+        pass
+
+
+def _acquire_ydl(pool_key: str, opts: Dict[str, Any]) -> yt_dlp.YoutubeDL:
+    with _YDL_POOL_LOCK:
+        idle = _YDL_POOL.get(pool_key)
+        if idle:
+            _YDL_POOL.move_to_end(pool_key)
+            return idle.pop()
+        generation = _YDL_POOL_GENERATION
+    cookiefile = opts.get("cookiefile")
+    with _COOKIE_SAVE_LOCK:
+        stamp = _cookie_stamp(cookiefile) if cookiefile else None
+        # The constructor loads the jar, so it matches the stamp taken under the lock.
+        ydl = yt_dlp.YoutubeDL(opts)
+    ydl._mjyt_generation = generation
+    ydl._mjyt_cookie_stamp = stamp
+    ydl._mjyt_cookie_snapshot = _jar_snapshot(ydl) if stamp is not None else None
+    return ydl
+
+
+def _release_ydl(pool_key: str, ydl: yt_dlp.YoutubeDL) -> None:
+    evicted: List[yt_dlp.YoutubeDL] = []
+    fresh = _persist_cookies(ydl)
+    with _YDL_POOL_LOCK:
+        if not fresh or getattr(ydl, "_mjyt_generation", None) != _YDL_POOL_GENERATION:
+            evicted.append(ydl)
+        else:
+            idle = _YDL_POOL.setdefault(pool_key, [])
+            _YDL_POOL.move_to_end(pool_key)
+            if len(idle) < YDL_POOL_IDLE_PER_KEY:
+                idle.append(ydl)
+            else:
+                evicted.append(ydl)
+        while len(_YDL_POOL) > YDL_POOL_KEYS:
+            evicted.extend(_YDL_POOL.popitem(last=False)[1])
+    for item in evicted:
+        _close_ydl(item)
+
+
+@atexit.register
+def reset_ydl_pool() -> None:
+    global _YDL_POOL_GENERATION
+    with _YDL_POOL_LOCK:
+        _YDL_POOL_GENERATION += 1
+        idle = [ydl for items in _YDL_POOL.values() for ydl in items]
+        _YDL_POOL.clear()
+    for ydl in idle:
+        _close_ydl(ydl)
+
+
+def invalidate_cookie_caches() -> None:
+    _ISFILE_CACHE.clear()
+    invalidate_info_cache()
+    reset_ydl_pool()
+
+
+class _DiskInfoCache:
+    def __init__(self, path: str, ttl: int) -> None:
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, url TEXT, ts INTEGER, body BLOB)")
+        self._conn.execute("DELETE FROM info WHERE ts < ?", (int(time.time()) - ttl,))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT ts, body FROM info WHERE key = ?", (key,)).fetchone()
+            if row is None or time.time() - row[0] >= self._ttl:
+                return None
+            info = _json.loads(zlib.decompress(row[1]))
+        except Exception:
+            return None
+        return info if isinstance(info, dict) else None
+
+    def put(self, key: str, url: str, info: Dict[str, Any]) -> None:
+        try:
+            body = zlib.compress(_json.dumps_bytes(yt_dlp.YoutubeDL.sanitize_info(info)))
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO info (key, url, ts, body) VALUES (?, ?, ?, ?)",
+                    (key, url, int(time.time()), body),
+                )
+        except Exception:
+            pass
+
+    def invalidate(self, url: Optional[str] = None) -> None:
+        try:
+            with self._lock:
+                if url is None:
+                    self._conn.execute("DELETE FROM info")
+                else:
+                    self._conn.execute("DELETE FROM info WHERE url = ?", (url,))
+        except sqlite3.Error:
+            pass
+
+
+def enable_disk_cache(path: Optional[str] = None, ttl: int = DEFAULT_DISK_CACHE_TTL) -> None:
+    global _DISK_CACHE, _DISK_CACHE_CHECKED
+    cache = _DiskInfoCache(path or os.path.join(get_data_dir(), DISK_CACHE_FILENAME), ttl)
+    with _DISK_CACHE_LOCK:
+        _DISK_CACHE = cache
+        _DISK_CACHE_CHECKED = True
+
+
+def _disk_cache() -> Optional[_DiskInfoCache]:
+    global _DISK_CACHE_CHECKED
+    if _DISK_CACHE_CHECKED:
+        return _DISK_CACHE
+    with _DISK_CACHE_LOCK:
+        if _DISK_CACHE_CHECKED:
+            return _DISK_CACHE
+        _DISK_CACHE_CHECKED = True
+        raw = (os.getenv("MJYTDLP_INFO_CACHE_TTL") or "").strip()
+    if not raw:
+        return None
+    try:
+        ttl = int(raw)
+    except ValueError:
+        eprint(f"WARNING: invalid MJYTDLP_INFO_CACHE_TTL={raw!r}; disk info cache disabled.")
+        return None
+    if ttl > 0:
+        try:
+            enable_disk_cache(ttl=ttl)
+        except (OSError, sqlite3.Error) as exc:
+            eprint(f"WARNING: unable to open disk info cache: {exc}")
+    return _DISK_CACHE
+
+
+def _disk_cache_key(key: Tuple[Any, ...]) -> str:
+    return hashlib.sha256(_json.dumps_bytes(list(key))).hexdigest()
+
+
+def _info_cache_key(url: str, opts: Dict[str, Any]) -> Tuple[Any, ...]:
+    headers = opts.get("http_headers") or {}
+    return (url, opts.get("cookiefile"), opts.get("proxy"), headers.get("User-Agent"), headers.get("Referer"))
+
+
+def invalidate_info_cache(url: Optional[str] = None) -> None:
+    with _INFO_CACHE_LOCK:
+        if url is None:
+            _INFO_CACHE.clear()
+        else:
+            for key in [k for k in _INFO_CACHE if k[0] == url]:
+                del _INFO_CACHE[key]
+    disk = _disk_cache()
+    if disk is not None:
+        disk.invalidate(url)
+
+
+def _drop_expired_info(now: float) -> None:
+    # Entries stay in insertion order, so the expired ones are all at the front.
+    while _INFO_CACHE:
+        stored_at = next(iter(_INFO_CACHE.values()))[0]
+        if now - stored_at < INFO_CACHE_TTL:
+            break
+        _INFO_CACHE.popitem(last=False)
+
+
+def _remember_info(key: Tuple[Any, ...], info: Dict[str, Any], now: float) -> None:
+    with _INFO_CACHE_LOCK:
+        _drop_expired_info(now)
+        _INFO_CACHE[key] = (now, info)
+        _INFO_CACHE.move_to_end(key)
+        while len(_INFO_CACHE) > INFO_CACHE_SIZE:
+            _INFO_CACHE.popitem(last=False)
+
+
+def _with_ydl(opts: Dict[str, Any], fn: Callable[[yt_dlp.YoutubeDL], Any]) -> Any:
+    pool_key = _json.dumps(opts, sort_keys=True)
+    ydl = _acquire_ydl(pool_key, opts)
+    try:
+        result = fn(ydl)
     except Exception as exc:
+        _persist_cookies(ydl)
+        _close_ydl(ydl)
         raise YtDlpError(str(exc)) from exc
+    _release_ydl(pool_key, ydl)
+    return result
+
+
+def _run_extractor(url: str, opts: Dict[str, Any]) -> Any:
+    return _with_ydl(opts, lambda ydl: ydl.extract_info(url, download=False))
+
+
+def _first_playlist_entry(entries: Any) -> Optional[Dict[str, Any]]:
+    if isinstance(entries, yt_dlp.utils.PagedList):
+        entries = entries.getslice(0, PLAYLIST_SCAN_LIMIT)
+    if entries is None or isinstance(entries, (dict, str, bytes)):
+        return None
+    return next((e for e in islice(entries, PLAYLIST_SCAN_LIMIT) if isinstance(e, dict)), None)
+
+
+def _resolve_unprocessed(ydl: yt_dlp.YoutubeDL, url: str) -> Optional[Dict[str, Any]]:
+    # Follows redirects and playlists by hand on one instance, so no extractor runs twice.
+    info = ydl.extract_info(url, download=False, process=False)
+    for _ in range(LIGHTWEIGHT_RESOLVE_HOPS):
+        if not isinstance(info, dict):
+            return None
+        kind = info.get("_type", "video")
+        if kind == "video":
+            return info
+        if kind == "playlist":
+            entry = _first_playlist_entry(info.get("entries"))
+            if entry is None:
+                return None
+            for field in ("extractor", "extractor_key", "webpage_url"):
+                entry.setdefault(field, info.get(field))
+            info = entry
+        elif kind in ("url", "url_transparent"):
+            inner = ydl.extract_info(info["url"], download=False, ie_key=info.get("ie_key"), process=False)
+            if kind == "url_transparent" and isinstance(inner, dict):
+                exempt = ("_type", "url", "ie_key", "id", "extractor", "extractor_key")
+                inner = {**inner, **{k: v for k, v in info.items() if v is not None and k not in exempt}}
+            info = inner
+        else:
+            return None
+    return info if isinstance(info, dict) and info.get("_type", "video") == "video" else None
+
+
+def _lightweight_info(url: str, opts: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    raw = _with_ydl(opts, lambda ydl: _resolve_unprocessed(ydl, url))
+    if raw is None:
+        return None
+    info = yt_dlp.YoutubeDL.sanitize_info(raw)
+    # The derivations process_video_result would have made for the summarized fields.
+    if not info.get("thumbnail"):
+        thumbnails = info.get("thumbnails")
+        if isinstance(thumbnails, list):
+            urls = [t.get("url") for t in thumbnails if isinstance(t, dict) and t.get("url")]
+            if urls:
+                info["thumbnail"] = urls[-1]
+    if info.get("upload_date") is None and info.get("timestamp") is not None:
+        info["upload_date"] = yt_dlp.utils.strftime_or_none(info["timestamp"])
+    live_status = info.get("live_status")
+    if live_status is None:
+        if info.get("is_live"):
+            live_status = "is_live"
+        elif info.get("is_live") is False and info.get("was_live"):
+            live_status = "was_live"
+        elif info.get("is_live") is False and info.get("was_live") is False:
+            live_status = "not_live"
+    if live_status:
+        info["live_status"] = live_status
+        for field in ("is_live", "was_live"):
+            if info.get(field) is None:
+                info[field] = live_status == field
+    if live_status == "post_live":
+        info["was_live"] = True
+    return info
 
-    if isinstance(info, dict) and info.get("_type") == "playlist":
-        entries = info.get("entries")
-        if isinstance(entries, list):
-            first = next((e for e in entries if isinstance(e, dict)), None)
-            if isinstance(first, dict):
+
+def _extract_info(url: str, options: ExtractOptions, lightweight: bool = False) -> Dict[str, Any]:
+    opts = _build_ydl_opts(options)
+    full_key = _info_cache_key(url, opts)
+    light_key = full_key + ("lightweight",)
+    # A full extraction also satisfies a lightweight lookup.
+    keys = (full_key, light_key) if lightweight else (full_key,)
+    now = time.monotonic()
+    with _INFO_CACHE_LOCK:
+        _drop_expired_info(now)
+        for key in keys:
+            cached = _INFO_CACHE.get(key)
+            if cached is not None:
+                return cached[1]
+
+    disk = _disk_cache()
+    if disk is not None:
+        for key in keys:
+            info = disk.get(_disk_cache_key(key))
+            if info is not None:
+                _remember_info(key, info, now)
+                return info
+
+    key = full_key
+    info = _lightweight_info(url, opts) if lightweight else None
+    if info is not None:
+        key = light_key
+    else:
+        info = _run_extractor(url, opts)
+        if isinstance(info, dict) and info.get("_type") == "playlist":
+            first = _first_playlist_entry(info.get("entries"))
+            if first is not None:
                 info = first
-    if not isinstance(info, dict):
-        raise YtDlpError("Failed to extract info")
+        if not isinstance(info, dict):
+            raise YtDlpError("Failed to extract info")
+
+    if disk is not None:
+        disk.put(_disk_cache_key(key), url, info)
+    _remember_info(key, info, now)
     return info
 
 
+def _normalized_headers(holder: Dict[str, Any]) -> Dict[str, str]:
+    headers = holder.get("_mjyt_headers")
+    if headers is None:
+        raw = holder.get("http_headers")
+        headers = {str(k): str(v) for k, v in raw.items()} if isinstance(raw, dict) else {}
+        holder["_mjyt_headers"] = headers
+    return headers
+
+
 def _safe_headers(info: Dict[str, Any], fmt: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    # Normalized once per info/format dict and shared; callers must treat the result as read-only.
     if isinstance(fmt, dict) and isinstance(fmt.get("http_headers"), dict):
-        return {str(k): str(v) for k, v in fmt.get("http_headers", {}).items()}
-    if isinstance(info.get("http_headers"), dict):
-        return {str(k): str(v) for k, v in info.get("http_headers", {}).items()}
-    return {}
+        return _normalized_headers(fmt)
+    return _normalized_headers(info)
 
 
 def _summarize_info(info: Dict[str, Any], full: bool = False) -> Dict[str, Any]:
@@ -158,42 +620,96 @@ def _summarize_info(info: Dict[str, Any], full: bool = False) -> Dict[str, Any]:
     return data
 
 
-def probe(url: str, options: Dict[str, Any], full: bool = False) -> Dict[str, Any]:
-    info = _extract_info(url, options)
+def probe(url: str, options: Dict[str, Any] | ExtractOptions, full: bool = False) -> Dict[str, Any]:
+    info = _extract_info(url, _parse_options(options), lightweight=not full)
     return _summarize_info(info, full=full)
 
 
+def _host_delay(host: str) -> float:
+    for suffix, delay in HOST_DELAYS:
+        if host == suffix or host.endswith("." + suffix):
+            return delay
+    return DEFAULT_HOST_DELAY
+
+
+class _DomainRateLimiter:
+    def __init__(self) -> None:
+        self._next: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host: Optional[str]) -> None:
+        if not host:
+            return
+        delay = _host_delay(host)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, 0.0))
+            self._next[host] = slot + delay
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_BATCH_LIMITER = _DomainRateLimiter()
+
+
+def batch_probe(
+    urls: List[str],
+    options: Dict[str, Any],
+    full: bool = False,
+    max_workers: int = BATCH_PROBE_MAX_WORKERS,
+) -> List[Dict[str, Any]]:
+    parsed = _parse_options(options)
+
+    def _one(url: str) -> Dict[str, Any]:
+        try:
+            _BATCH_LIMITER.wait(urlsplit(url).hostname)
+        except ValueError:
+            pass
+        try:
+            return probe(url, parsed, full=full)
+        except YtDlpError as exc:
+            return {"url": url, "error": str(exc)}
+
+    if not urls:
+        return []
+    workers = max(1, min(max_workers, BATCH_PROBE_MAX_WORKERS, len(urls)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_one, urls))
+
+
 def formats(url: str, options: Dict[str, Any], limit: Optional[int] = None) -> Dict[str, Any]:
-    info = _extract_info(url, options)
+    info = _extract_info(url, _parse_options(options))
     raw_formats = info.get("formats") if isinstance(info.get("formats"), list) else []
+    max_items = limit if isinstance(limit, int) and limit > 0 else None
     items: List[Dict[str, Any]] = []
     for fmt in raw_formats:
+        if max_items is not None and len(items) >= max_items:
+            break
         if not isinstance(fmt, dict):
             continue
-        item = {
-            "format_id": fmt.get("format_id"),
-            "ext": fmt.get("ext"),
-            "format_note": fmt.get("format_note"),
-            "resolution": fmt.get("resolution") or (
-                f"{fmt.get('width')}x{fmt.get('height')}" if fmt.get("width") and fmt.get("height") else None
-            ),
-            "width": fmt.get("width"),
-            "height": fmt.get("height"),
-            "fps": fmt.get("fps"),
-            "vcodec": fmt.get("vcodec"),
-            "acodec": fmt.get("acodec"),
-            "tbr": fmt.get("tbr"),
-            "abr": fmt.get("abr"),
-            "filesize": fmt.get("filesize"),
-            "filesize_approx": fmt.get("filesize_approx"),
-            "protocol": fmt.get("protocol"),
-            "download_url": fmt.get("url"),
-            "manifest_url": fmt.get("manifest_url"),
-            "http_headers": _safe_headers(info, fmt),
-        }
-        items.append(item)
-    if isinstance(limit, int) and limit > 0:
-        items = items[:limit]
+        width = fmt.get("width")
+        height = fmt.get("height")
+        items.append(
+            {
+                "format_id": fmt.get("format_id"),
+                "ext": fmt.get("ext"),
+                "format_note": fmt.get("format_note"),
+                "resolution": fmt.get("resolution") or (f"{width}x{height}" if width and height else None),
+                "width": width,
+                "height": height,
+                "fps": fmt.get("fps"),
+                "vcodec": fmt.get("vcodec"),
+                "acodec": fmt.get("acodec"),
+                "tbr": fmt.get("tbr"),
+                "abr": fmt.get("abr"),
+                "filesize": fmt.get("filesize"),
+                "filesize_approx": fmt.get("filesize_approx"),
+                "protocol": fmt.get("protocol"),
+                "download_url": fmt.get("url"),
+                "manifest_url": fmt.get("manifest_url"),
+                "http_headers": _safe_headers(info, fmt),
+            }
+        )
     return {
         "id": info.get("id"),
         "title": info.get("title"),
@@ -203,48 +719,49 @@ def formats(url: str, options: Dict[str, Any], limit: Optional[int] = None) -> D
     }
 
 
+def _is_hls(fmt: Dict[str, Any]) -> bool:
+    protocol = str(fmt.get("protocol") or "").lower()
+    if "m3u8" in protocol:
+        return True
+    if str(fmt.get("ext") or "").lower() == "m3u8":
+        return True
+    return ".m3u8" in str(fmt.get("url") or "").lower()
+
+
+def _audio_score(fmt: Dict[str, Any]) -> Tuple[float, float]:
+    bitrate = fmt.get("abr") or fmt.get("tbr") or 0
+    size = fmt.get("filesize") or fmt.get("filesize_approx") or 0
+    return float(bitrate), float(size)
+
+
 def _pick_audio_format(info: Dict[str, Any]) -> Dict[str, Any]:
     formats_list = info.get("formats") if isinstance(info.get("formats"), list) else []
-    audio_only: List[Dict[str, Any]] = []
+    # (score, fmt) for: best non-HLS audio-only, best audio-only, best non-HLS fallback with a url.
+    best_direct: Optional[Tuple[Tuple[float, float], Dict[str, Any]]] = None
+    best_audio: Optional[Tuple[Tuple[float, float], Dict[str, Any]]] = None
+    best_other: Optional[Tuple[Tuple[float, float], Dict[str, Any]]] = None
     for fmt in formats_list:
         if not isinstance(fmt, dict):
             continue
         if fmt.get("vcodec") == "none" and fmt.get("acodec") not in (None, "none"):
-            audio_only.append(fmt)
-
-    def _is_hls(fmt: Dict[str, Any]) -> bool:
-        protocol = str(fmt.get("protocol") or "").lower()
-        ext = str(fmt.get("ext") or "").lower()
-        url = str(fmt.get("url") or "").lower()
-        if "m3u8" in protocol:
-            return True
-        if ext == "m3u8":
-            return True
-        if ".m3u8" in url:
-            return True
-        return False
-
-    def _score(fmt: Dict[str, Any]) -> Tuple[float, float]:
-        bitrate = fmt.get("abr") or fmt.get("tbr") or 0
-        size = fmt.get("filesize") or fmt.get("filesize_approx") or 0
-        return float(bitrate), float(size)
-
-    if audio_only:
-        direct_audio = [f for f in audio_only if not _is_hls(f)]
-        if direct_audio:
-            return max(direct_audio, key=_score)
-        return max(audio_only, key=_score)
-
-    candidates = [
-        f for f in formats_list if isinstance(f, dict) and f.get("url") and not _is_hls(f)
-    ]
-    if not candidates:
+            score = _audio_score(fmt)
+            if best_audio is None or score > best_audio[0]:
+                best_audio = (score, fmt)
+            if (best_direct is None or score > best_direct[0]) and not _is_hls(fmt):
+                best_direct = (score, fmt)
+        elif best_audio is None and fmt.get("url") and not _is_hls(fmt):
+            score = _audio_score(fmt)
+            if best_other is None or score > best_other[0]:
+                best_other = (score, fmt)
+
+    best = best_direct or best_audio or best_other
+    if best is None:
         raise YtDlpError("No audio stream found")
-    return max(candidates, key=_score)
+    return best[1]
 
 
 def audio_stream(url: str, options: Dict[str, Any]) -> Dict[str, Any]:
-    info = _extract_info(url, options)
+    info = _extract_info(url, _parse_options(options))
     fmt = _pick_audio_format(info)
     return {
         "id": info.get("id"),
@@ -260,27 +777,50 @@ def audio_stream(url: str, options: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _collect_subs(source: Any, is_auto: bool, langs: Optional[List[str]]) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
+class _SubsIndex(NamedTuple):
+    rows: Dict[str, List[Dict[str, Any]]]
+    urls: Dict[Tuple[str, str], str]
+    first: Dict[str, str]
+
+
+def _build_subs_index(source: Any) -> _SubsIndex:
+    index = _SubsIndex({}, {}, {})
     if not isinstance(source, dict):
-        return out
+        return index
     for lang, tracks in source.items():
-        if langs and lang not in langs:
+        rows: List[Dict[str, Any]] = []
+        index.rows[lang] = rows
+        if not isinstance(tracks, list):
             continue
-        formats_list: List[Dict[str, Any]] = []
-        if isinstance(tracks, list):
-            for track in tracks:
-                if not isinstance(track, dict):
-                    continue
-                formats_list.append(
-                    {
-                        "ext": track.get("ext"),
-                        "name": track.get("name"),
-                        "download_url": track.get("url"),
-                    }
-                )
-        out.append({"lang": lang, "is_auto": is_auto, "formats": formats_list})
-    return out
+        for track in tracks:
+            if not isinstance(track, dict):
+                continue
+            ext = track.get("ext")
+            track_url = track.get("url")
+            rows.append({"ext": ext, "name": track.get("name"), "download_url": track_url})
+            if track_url:
+                index.urls.setdefault((lang, ext), track_url)
+                index.first.setdefault(lang, track_url)
+    return index
+
+
+def _subs_index(info: Dict[str, Any], key: str) -> _SubsIndex:
+    # Indexed once per extracted info; the info dict itself is shared through the info cache.
+    cache_key = f"_mjyt_subs_index_{key}"
+    index = info.get(cache_key)
+    if index is None:
+        index = _build_subs_index(info.get(key))
+        info[cache_key] = index
+    return index
+
+
+def _collect_subs(index: _SubsIndex, is_auto: bool, langs: Optional[List[str]]) -> List[Dict[str, Any]]:
+    wanted = {lang for lang in langs if isinstance(lang, str)} if langs else None
+    return [
+        {"lang": lang, "is_auto": is_auto, "formats": rows}
+        for lang, rows in index.rows.items()
+        if wanted is None or lang in wanted
+    ]
 
 
 def list_subs(
@@ -290,12 +830,12 @@ def list_subs(
     include_manual: bool = True,
     langs: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
-    info = _extract_info(url, options)
+    info = _extract_info(url, _parse_options(options))
     subtitles: List[Dict[str, Any]] = []
     if include_manual:
-        subtitles.extend(_collect_subs(info.get("subtitles"), False, langs))
+        subtitles.extend(_collect_subs(_subs_index(info, "subtitles"), False, langs))
     if include_auto:
-        subtitles.extend(_collect_subs(info.get("automatic_captions"), True, langs))
+        subtitles.extend(_collect_subs(_subs_index(info, "automatic_captions"), True, langs))
     return {
         "id": info.get("id"),
         "title": info.get("title"),
@@ -311,37 +851,48 @@ def _pick_subtitle_track(
     auto: Optional[bool],
     fmt: Optional[str],
 ) -> Tuple[str, bool]:
-    def _find(subs: Any) -> Optional[List[Dict[str, Any]]]:
-        if not isinstance(subs, dict):
-            return None
-        tracks = subs.get(lang)
-        return tracks if isinstance(tracks, list) else None
-
-    prefer_formats = [fmt] if fmt else ["vtt", "srt", "srv3", "srv2", "srv1", "ttml"]
+    prefer_formats = (fmt,) if fmt else _DEFAULT_SUB_FORMATS
 
-    search_order = []
     if auto is True:
-        search_order = [(True, info.get("automatic_captions"))]
+        search_order = [(True, "automatic_captions")]
     elif auto is False:
-        search_order = [(False, info.get("subtitles"))]
+        search_order = [(False, "subtitles")]
     else:
-        search_order = [(False, info.get("subtitles")), (True, info.get("automatic_captions"))]
+        search_order = [(False, "subtitles"), (True, "automatic_captions")]
 
-    for is_auto, source in search_order:
-        tracks = _find(source)
-        if not tracks:
-            continue
+    for is_auto, key in search_order:
+        index = _subs_index(info, key)
         for pf in prefer_formats:
-            for track in tracks:
-                if isinstance(track, dict) and track.get("ext") == pf and track.get("url"):
-                    return track.get("url"), is_auto
-        first = next((t for t in tracks if isinstance(t, dict) and t.get("url")), None)
-        if first:
-            return first.get("url"), is_auto
+            track_url = index.urls.get((lang, pf))
+            if track_url:
+                return track_url, is_auto
+        track_url = index.first.get(lang)
+        if track_url:
+            return track_url, is_auto
 
     raise YtDlpError("Subtitle not found")
 
 
+def _decode_subtitle(resp: requests.Response) -> str:
+    # Subtitle endpoints are almost always UTF-8; skip requests' charset sniffing over the whole body.
+    encoding = resp.encoding
+    if not encoding or encoding.lower() == "iso-8859-1":
+        encoding = "utf-8"
+    try:
+        return resp.content.decode(encoding, errors="replace")
+    except LookupError:
+        return resp.content.decode("utf-8", errors="replace")
+
+
+def _fetch_subtitle(subtitle_url: str, headers: Dict[str, str], timeout: int) -> str:
+    try:
+        resp = _HTTP_SESSION.get(subtitle_url, headers=headers, timeout=timeout)
+        resp.raise_for_status()
+    except requests.RequestException as exc:
+        raise YtDlpError(f"Subtitle fetch failed: {exc}") from exc
+    return _decode_subtitle(resp)
+
+
 def download_subs(
     url: str,
     lang: str,
@@ -350,7 +901,8 @@ def download_subs(
     auto: Optional[bool] = None,
     link_only: bool = False,
 ) -> Dict[str, Any]:
-    info = _extract_info(url, options)
+    parsed = _parse_options(options)
+    info = _extract_info(url, parsed)
     subtitle_url, is_auto = _pick_subtitle_track(info, lang, auto, fmt)
     headers = _safe_headers(info)
 
@@ -363,25 +915,41 @@ def download_subs(
             "http_headers": headers,
         }
 
-    timeout = options.get("timeout")
-    timeout_val = int(timeout) if isinstance(timeout, (int, float)) and timeout > 0 else DEFAULT_TIMEOUT
-    try:
-        resp = requests.get(subtitle_url, headers=headers, timeout=timeout_val)
-        resp.raise_for_status()
-    except requests.RequestException as exc:
-        raise YtDlpError(f"Subtitle fetch failed: {exc}") from exc
-
     return {
         "lang": lang,
         "format": fmt,
         "is_auto": is_auto,
-        "content": resp.text,
+        "content": _fetch_subtitle(subtitle_url, headers, parsed.timeout or DEFAULT_TIMEOUT),
     }
 
 
+def download_subs_batch(
+    url: str,
+    langs: List[str],
+    options: Dict[str, Any],
+    fmt: Optional[str] = None,
+    auto: Optional[bool] = None,
+    max_workers: int = SUBS_BATCH_MAX_WORKERS,
+) -> List[Dict[str, Any]]:
+    parsed = _parse_options(options)
+    info = _extract_info(url, parsed)
+    headers = _safe_headers(info)
+    timeout_val = parsed.timeout or DEFAULT_TIMEOUT
+
+    def _one(lang: str) -> Dict[str, Any]:
+        try:
+            subtitle_url, is_auto = _pick_subtitle_track(info, lang, auto, fmt)
+            content = _fetch_subtitle(subtitle_url, headers, timeout_val)
+        except YtDlpError as exc:
+            return {"lang": lang, "format": fmt, "error": str(exc)}
+        return {"lang": lang, "format": fmt, "is_auto": is_auto, "content": content}
+
+    if not langs:
+        return []
+    workers = max(1, min(max_workers, SUBS_BATCH_MAX_WORKERS, len(langs)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_one, langs))
+
+
 def yt_dlp_version() -> Dict[str, Any]:
-    try:
-        version = yt_dlp.version.__version__
-    except Exception:
-        version = getattr(yt_dlp, "__version__", None)
-    return {"version": version}
+    return {"version": _YT_DLP_VERSION}